@@ -0,0 +1,168 @@
+# Arquivo: benchmarks/startup_importtime.py
+"""
+Benchmark de startup do ponto de entrada do chat (main.py).
+
+Mede, com `python -X importtime`, o custo de `import main` e falha (exit code 1)
+se o tempo cumulativo ultrapassar o orçamento ou se algum módulo pesado de
+ingestão/provedor for carregado durante o startup.
+
+Opcionalmente (--e2e) mede o tempo real do lançamento de `python main.py` até o
+prompt do chat aparecer e até os componentes (motor RAG, LLM, cadeias) estarem de
+fato carregados (requer o índice vetorial já existente).
+
+Uso:
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --budget-ms 300 --e2e
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Orçamento padrão para `import main` (milissegundos)
+ORCAMENTO_IMPORT_MS = 300
+# Orçamento padrão do lançamento até o prompt do chat (milissegundos)
+ORCAMENTO_E2E_MS = 1000
+# Orçamento padrão do lançamento até os componentes do chat carregados (milissegundos)
+ORCAMENTO_PRONTO_MS = 5000
+
+# Módulos que NÃO podem ser importados só para abrir o chat
+MODULOS_PROIBIDOS = [
+    "camelot",
+    "pdfplumber",
+    "pandas",
+    "torch",
+    "sentence_transformers",
+    "langchain_openai",
+    "langchain_community",
+    "langchain_chroma",
+    "chromadb",
+    "langchain_ollama",
+    "yaml",
+]
+
+PADRAO_LINHA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir_importtime(modulo: str = "main") -> List[Tuple[str, int, int]]:
+    """
+    Roda `python -X importtime -c "import <modulo>"` e devolve
+    uma lista de (nome_modulo, cumulativo_us, nivel).
+    """
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{resultado.stderr}")
+
+    registros = []
+    for linha in resultado.stderr.splitlines():
+        m = PADRAO_LINHA.match(linha)
+        if not m:
+            continue
+        _, cumulativo, indentacao, nome = m.groups()
+        nivel = max(len(indentacao) - 1, 0) // 2
+        registros.append((nome, int(cumulativo), nivel))
+    return registros
+
+
+def resumir(registros: List[Tuple[str, int, int]], top: int = 10) -> Dict:
+    total_us = sum(c for _, c, nivel in registros if nivel == 0)
+    carregados = {nome.split(".")[0] for nome, _, _ in registros}
+    proibidos = [m for m in MODULOS_PROIBIDOS if m in carregados]
+    mais_lentos = sorted(
+        ((n, c) for n, c, nivel in registros if nivel == 0), key=lambda x: -x[1]
+    )[:top]
+    return {"total_ms": total_us / 1000, "proibidos": proibidos, "mais_lentos": mais_lentos}
+
+
+def medir_e2e(timeout: float = 60.0) -> Tuple[float, float]:
+    """
+    Lança `python main.py`, escolhe a opção de chat e mede o tempo (ms) até a
+    linha '--- ECLADATTA PRONTO ---' (prompt) e até '--- COMPONENTES PRONTOS ---'
+    (carregamento em segundo plano concluído, 1ª pergunta já pode ser respondida).
+    """
+    processo = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=BASE_DIR,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    inicio = time.perf_counter()
+    try:
+        processo.stdin.write("2\n")
+        processo.stdin.flush()
+        prompt_ms = None
+        while time.perf_counter() - inicio < timeout:
+            linha = processo.stdout.readline()
+            if not linha:
+                break
+            if "ECLADATTA PRONTO" in linha:
+                prompt_ms = (time.perf_counter() - inicio) * 1000
+            elif "COMPONENTES PRONTOS" in linha:
+                if prompt_ms is None:
+                    break
+                return prompt_ms, (time.perf_counter() - inicio) * 1000
+            elif "Falha ao carregar os componentes" in linha:
+                raise RuntimeError(linha.strip())
+        raise RuntimeError("O chat não ficou pronto (o índice vetorial existe?)")
+    finally:
+        processo.kill()
+        processo.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de startup do ECLADATTA")
+    parser.add_argument("--budget-ms", type=float, default=ORCAMENTO_IMPORT_MS)
+    parser.add_argument("--e2e", action="store_true", help="Mede também o lançamento até o prompt e até os componentes prontos")
+    parser.add_argument("--e2e-budget-ms", type=float, default=ORCAMENTO_E2E_MS)
+    parser.add_argument("--pronto-budget-ms", type=float, default=ORCAMENTO_PRONTO_MS)
+    args = parser.parse_args()
+
+    resumo = resumir(medir_importtime("main"))
+    print(f"import main: {resumo['total_ms']:.1f} ms (orçamento: {args.budget_ms:.0f} ms)")
+    print("Módulos mais lentos (nível 0):")
+    for nome, cumulativo in resumo["mais_lentos"]:
+        print(f"   {cumulativo / 1000:8.1f} ms  {nome}")
+
+    falhou = False
+    if resumo["proibidos"]:
+        print(f"❌ Módulos pesados carregados no startup: {', '.join(resumo['proibidos'])}")
+        falhou = True
+    if resumo["total_ms"] > args.budget_ms:
+        print("❌ Orçamento de import estourado.")
+        falhou = True
+
+    if args.e2e:
+        if not (BASE_DIR / "data" / "vector_db").exists():
+            print("⚠️ Índice vetorial inexistente: medição e2e ignorada.")
+        else:
+            e2e_ms, pronto_ms = medir_e2e()
+            print(f"lançamento -> prompt: {e2e_ms:.1f} ms (orçamento: {args.e2e_budget_ms:.0f} ms)")
+            print(f"lançamento -> componentes prontos: {pronto_ms:.1f} ms (orçamento: {args.pronto_budget_ms:.0f} ms)")
+            if e2e_ms > args.e2e_budget_ms:
+                print("❌ Orçamento de lançamento estourado.")
+                falhou = True
+            if pronto_ms > args.pronto_budget_ms:
+                print("❌ Orçamento de carregamento dos componentes estourado.")
+                falhou = True
+
+    if not falhou:
+        print("✅ Startup dentro do orçamento.")
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,16 @@
 import sys
 import os
-import json
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
+import argparse
+import threading
+from concurrent.futures import Future
+from pathlib import Path
 
 # Imports do Projeto
-from src.config import RAW_DIR, VECTOR_DB_DIR
-from src.ingestion.pdf_loader import processar_documento
-from src.ingestion.table_summarizer import gerar_resumos_tabelas
-from src.models.rag_engine import RAGEngine
-from src.models.llm_factory import LLMFactory
-from src.prompts.templates import PROMPT_RAG_FINAL, PROMPT_EXTRACAO
-from src.evaluation.hallucination_check import VerificadorAlucinacao
+# Apenas módulos leves (stdlib + config) são importados aqui. Ingestão (camelot,
+# pdfplumber, pandas) e modelos (langchain, chromadb, provedores de embedding)
+# são importados dentro das funções que os usam, para o chat abrir rápido.
+# Orçamento de startup verificado por benchmarks/startup_importtime.py.
+from src.config import RAW_DIR, VECTOR_DB_DIR, FACTS_DB, SNAPSHOT_PADRAO
 from src.evaluation.saver import configurar_logger, salvar_relacoes_csv
 
 # Inicializa o Logger Global
@@ -27,49 +26,100 @@ def verificar_arquivo_entrada():
     return arquivos[0].name
 
 
-def pipeline_ingestao(nome_arquivo):
+def pipeline_ingestao(nome_arquivo, edicao=None):
+    from src.ingestion.pdf_loader import processar_documento
+    from src.ingestion.table_summarizer import gerar_resumos_tabelas
+    from src.ingestion.fact_store import construir_fatos_tabelas
+    from src.models.rag_engine import RAGEngine
+
     logger.info(f"🚀 INICIANDO INGESTÃO: {nome_arquivo}")
 
     # 1. Extração
     logger.info("--- [Etapa 1.1] Extração Texto/Tabela ---")
-    processar_documento(nome_arquivo)
+    edicao = edicao or Path(nome_arquivo).stem
+    processar_documento(nome_arquivo, edicao)
+
+    logger.info("--- [Etapa 1.1b] Fatos Numéricos das Tabelas ---")
+    construir_fatos_tabelas()
 
     # 2. Resumo
     logger.info("--- [Etapa 1.2] Geração de Resumos ---")
     gerar_resumos_tabelas()
 
-    # 3. Indexação
+    # 3. Indexação (apenas o shard da edição processada; os demais ficam intactos)
     logger.info("--- [Etapa 2.1] Indexação Vetorial ---")
     motor = RAGEngine()
-    motor.indexar_dados()
+    motor.indexar_dados(edicoes=[edicao])
 
     logger.info("✅ Ingestão concluída!")
 
 
-def pipeline_chat():
-    logger.info("🤖 SISTEMA ECLADATTA - INICIADO")
+def exportar_snapshot(destino):
+    """Empacota o índice atual (vetores, documentos pais e metadados) num único arquivo."""
+    from src.models.rag_engine import RAGEngine
+
+    logger.info(f"📦 Exportando snapshot do índice para {destino}")
+    RAGEngine().exportar_snapshot(destino)
+
+
+def carregar_componentes_chat(snapshot=None):
+    """
+    Carrega a parte pesada do chat: motor RAG, LLM, verificador e cadeias.
+    Com `snapshot`, o motor é aberto somente leitura a partir do arquivo empacotado.
+    Retorna (retriever, rag_chain, extraction_chain, verificador, fatos).
+    """
+    from src.models.rag_engine import RAGEngine
+    from src.models.llm_factory import LLMFactory
+    from src.models.chains import criar_rag_chain, criar_extraction_chain
+    from src.evaluation.hallucination_check import VerificadorAlucinacao
+    from src.ingestion.fact_store import FactStore
 
     # Carrega Motor
-    motor = RAGEngine()
+    motor = RAGEngine(snapshot=snapshot)
     retriever = motor.get_retriever()
     llm = LLMFactory.create_chat_model(temperature=0)
-    verificador = VerificadorAlucinacao()
-
-    # Cadeia de Chat (Conversa)
-    rag_chain = (
-            {"context": retriever, "question": RunnablePassthrough()}
-            | PROMPT_RAG_FINAL
-            | llm
-            | StrOutputParser()
-    )
-
-    # Cadeia de Extração (Para popular o CSV)
-    # Usa o prompt específico 'extracao_relacoes' do seu YAML
-    extraction_chain = (
-            PROMPT_EXTRACAO
-            | llm
-            | StrOutputParser()
-    )
+    fatos = FactStore(FACTS_DB) if FACTS_DB.exists() else None
+    verificador = VerificadorAlucinacao(llm=llm, fatos=fatos)
+
+    # Cadeia de Chat (Conversa) e Cadeia de Extração (Para popular o CSV)
+    rag_chain = criar_rag_chain(retriever, llm)
+    extraction_chain = criar_extraction_chain(llm)
+
+    return retriever, rag_chain, extraction_chain, verificador, fatos
+
+
+def carregar_em_segundo_plano(funcao) -> Future:
+    """
+    Executa `funcao` numa thread daemon e devolve um Future com o resultado.
+    Permite exibir o prompt imediatamente enquanto os modelos são carregados.
+    """
+    futuro = Future()
+
+    def _executar():
+        try:
+            futuro.set_result(funcao())
+        except BaseException as e:
+            futuro.set_exception(e)
+
+    threading.Thread(target=_executar, name="carregamento-chat", daemon=True).start()
+    return futuro
+
+
+def _avisar_carregamento(futuro: Future):
+    """Sinaliza no terminal quando os componentes do chat terminam de carregar (ou falham)."""
+    erro = futuro.exception()
+    if erro is not None:
+        print(f"\n❌ Falha ao carregar os componentes do chat: {erro}")
+    else:
+        print("\n--- COMPONENTES PRONTOS ---")
+
+
+def pipeline_chat(snapshot=None):
+    logger.info("🤖 SISTEMA ECLADATTA - INICIADO")
+
+    # O carregamento dos modelos corre em paralelo à digitação da 1ª pergunta
+    componentes = carregar_em_segundo_plano(lambda: carregar_componentes_chat(snapshot))
+    componentes.add_done_callback(_avisar_carregamento)
 
     print("\n--- ECLADATTA PRONTO ---")
     print("Digite 'sair' para encerrar.")
@@ -82,6 +132,9 @@ def pipeline_chat():
         if pergunta.lower() in ['sair', 'exit']:
             break
 
+        # Aguarda o carregamento (só bloqueia se a 1ª pergunta chegar antes dele)
+        retriever, rag_chain, extraction_chain, verificador, fatos = componentes.result()
+
         # Opção manual para salvar no CSV (ou poderia ser automático)
         if pergunta.lower() == 'extrair':
             if not ultimo_contexto:
@@ -103,6 +156,13 @@ def pipeline_chat():
 
         # Fluxo Normal de Chat
         logger.info(f"Pergunta recebida: {pergunta}")
+
+        # 0. Pergunta factual simples: responde direto da célula da tabela, sem LLM
+        fato = fatos.responder(pergunta) if fatos is not None else None
+        if fato:
+            print(f"\n🤖 ECLADATTA: {fatos.formatar_resposta(fato)}")
+            continue
+
         print("⏳ Processando...", end="\r")
 
         # 1. Recupera Contexto
@@ -126,21 +186,60 @@ def pipeline_chat():
         # salvar_relacoes_csv(extraction_chain.invoke({...}), fonte="auto")
 
 
+def pipeline_servidor(host: str = None, porta: int = None, snapshot=None):
+    """Sobe o servidor HTTP local que compartilha um único RAGEngine entre clientes."""
+    from src.api.server import iniciar_servidor
+
+    logger.info("🌐 SISTEMA ECLADATTA - MODO SERVIDOR")
+    iniciar_servidor(host=host, porta=porta, snapshot=snapshot)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="ECLADATTA - RAG para documentos econômicos")
+    parser.add_argument("--servidor", action="store_true", help="Inicia o servidor HTTP local")
+    parser.add_argument("--host", default=None, help="Host do servidor (padrão: config)")
+    parser.add_argument("--porta", type=int, default=None, help="Porta do servidor (padrão: config)")
+    parser.add_argument("--exportar-snapshot", nargs="?", const=str(SNAPSHOT_PADRAO), default=None,
+                        metavar="ARQUIVO", help="Exporta o índice atual num snapshot e encerra")
+    parser.add_argument("--snapshot", default=None, metavar="ARQUIVO",
+                        help="Sobe chat/servidor somente leitura a partir de um snapshot (sem ingestão)")
+    parser.add_argument("--edicao", default=None,
+                        help="Edição do PDF ingerido (padrão: nome do arquivo); PDFs da mesma edição "
+                             "formam um shard e são deduplicados entre si")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        if args.servidor:
+            pipeline_servidor(args.host, args.porta, snapshot=args.snapshot)
+        else:
+            pipeline_chat(snapshot=args.snapshot)
+        return
+
     if not os.path.exists(VECTOR_DB_DIR):
         print("Banco de dados não encontrado. Iniciando ingestão...")
         arquivo = verificar_arquivo_entrada()
-        pipeline_ingestao(arquivo)
+        pipeline_ingestao(arquivo, args.edicao)
+
+    if args.exportar_snapshot:
+        exportar_snapshot(args.exportar_snapshot)
+        return
+
+    if args.servidor:
+        pipeline_servidor(args.host, args.porta)
+        return
 
     # Menu simples
     print("1. Re-processar documentos")
     print("2. Iniciar Chat")
+    print("3. Iniciar Servidor HTTP")
     escolha = input("Opção: ").strip()
 
     if escolha == "1":
         arquivo = verificar_arquivo_entrada()
-        pipeline_ingestao(arquivo)
+        pipeline_ingestao(arquivo, args.edicao)
         pipeline_chat()
+    elif escolha == "3":
+        pipeline_servidor(args.host, args.porta)
     else:
         pipeline_chat()
 
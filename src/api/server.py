@@ -0,0 +1,262 @@
+# Arquivo: src/api/server.py
+"""
+Servidor HTTP local do ECLADATTA.
+
+Um único processo mantém o RAGEngine, o retriever e o LLM "aquecidos" e os
+compartilha entre todos os analistas, em vez de cada um abrir seu próprio
+main.py. As chamadas ao servidor de modelos passam por uma fila limitada
+(semáforo + teto de espera), evitando sobrecarregar o Ollama.
+
+Endpoints:
+    GET  /health    -> estado da fila
+    POST /ask       -> resposta RAG (streaming de texto por padrão)
+    POST /retrieve  -> apenas recuperação de contexto
+    POST /verify    -> verificação de alucinação numérica
+    POST /extract   -> extração de relações (JSON restrito ao schema), opcionalmente salva no CSV
+"""
+import asyncio
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import List, Optional, Union
+
+from fastapi import FastAPI, HTTPException
+from langchain_core.exceptions import OutputParserException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, model_validator
+from starlette.background import BackgroundTask
+
+from src.config import SERVER_HOST, SERVER_PORT, SERVER_MAX_CONCORRENCIA, SERVER_MAX_FILA
+
+logger = logging.getLogger("ECLADATTA")
+
+
+# --- CORPOS DAS REQUISIÇÕES ---
+class RecuperacaoRequest(BaseModel):
+    pergunta: str
+    k: Optional[int] = None
+    # Filtros repassados ao vector store (ver rag_engine.construir_filtro)
+    fonte: Optional[Union[str, List[str]]] = None
+    edicao: Optional[Union[str, List[str]]] = None
+    modalidade: Optional[Union[str, List[str]]] = None
+    pagina_min: Optional[int] = None
+    pagina_max: Optional[int] = None
+
+    def filtros(self) -> dict:
+        return self.model_dump(exclude={"pergunta", "stream", "verificar"}, exclude_none=True)
+
+
+class PerguntaRequest(RecuperacaoRequest):
+    stream: bool = True
+    verificar: bool = False
+
+    @model_validator(mode="after")
+    def _verificar_sem_stream(self):
+        # A análise precisa da resposta completa, que o streaming só tem depois de enviada
+        if self.stream and self.verificar:
+            raise ValueError("'verificar' exige 'stream': false.")
+        return self
+
+
+class VerificacaoRequest(BaseModel):
+    resposta: str
+    contexto: str
+
+
+class ExtracaoRequest(BaseModel):
+    texto: str
+    tabela: str = "Verificar contexto acima"
+    salvar: bool = False
+    fonte: str = "servidor"
+
+
+# --- FILA DE CONCORRÊNCIA ---
+class FilaModelo:
+    """
+    Limita quantas requisições usam o servidor de modelos ao mesmo tempo.
+    Até `max_concorrencia` executam; até `max_fila` aguardam; as demais recebem 503.
+    """
+
+    def __init__(self, max_concorrencia: int, max_fila: int):
+        self.max_concorrencia = max_concorrencia
+        self.max_fila = max_fila
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self.aguardando = 0
+        self.executando = 0
+
+    def cheia(self) -> bool:
+        # Só rejeita se a requisição teria de esperar (nenhuma vaga livre) e a espera já está lotada
+        return self._semaforo.locked() and self.aguardando >= self.max_fila
+
+    @asynccontextmanager
+    async def vaga(self):
+        if self.cheia():
+            raise HTTPException(status_code=503, detail="Fila do modelo cheia, tente novamente.")
+
+        self.aguardando += 1
+        try:
+            await self._semaforo.acquire()
+        finally:
+            self.aguardando -= 1
+
+        self.executando += 1
+        try:
+            yield
+        finally:
+            self.executando -= 1
+            self._semaforo.release()
+
+    def estado(self) -> dict:
+        return {
+            "executando": self.executando,
+            "aguardando": self.aguardando,
+            "max_concorrencia": self.max_concorrencia,
+            "max_fila": self.max_fila,
+        }
+
+
+# --- ESTADO COMPARTILHADO ---
+class EstadoServidor:
+    """Motor RAG, LLM e cadeias criados uma única vez por processo."""
+
+    def __init__(self, max_concorrencia: int = SERVER_MAX_CONCORRENCIA, max_fila: int = SERVER_MAX_FILA,
+                 snapshot: Optional[str] = None):
+        from src.models.rag_engine import RAGEngine
+        from src.models.llm_factory import LLMFactory
+        from src.models.chains import criar_resposta_chain, criar_extraction_chain
+        from src.evaluation.hallucination_check import VerificadorAlucinacao
+        from src.ingestion.fact_store import FactStore
+        from src.config import FACTS_DB
+
+        self.motor = RAGEngine(snapshot=snapshot)
+        self.retriever = self.motor.get_retriever()
+        self.llm = LLMFactory.create_chat_model(temperature=0)
+        self.resposta_chain = criar_resposta_chain(self.llm)
+        self.extraction_chain = criar_extraction_chain(self.llm)
+        self.fatos = FactStore(FACTS_DB) if FACTS_DB.exists() else None
+        self.verificador = VerificadorAlucinacao(llm=self.llm, fatos=self.fatos)
+        self.fila = FilaModelo(max_concorrencia, max_fila)
+
+    async def recuperar(self, pergunta: str, filtros: Optional[dict] = None) -> str:
+        from src.models.chains import formatar_contexto
+
+        retriever = self.motor.get_retriever(**filtros) if filtros else self.retriever
+        docs = await retriever.ainvoke(pergunta)
+        return formatar_contexto(docs)
+
+
+def criar_app(estado: Optional[EstadoServidor] = None, snapshot: Optional[str] = None) -> FastAPI:
+    """
+    Cria a aplicação FastAPI. Se `estado` não for passado, o motor é carregado
+    no startup do servidor (uma vez) e compartilhado por todas as requisições.
+    Com `snapshot`, o motor é aberto somente leitura a partir do arquivo empacotado.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if estado is None:
+            logger.info("⏳ Carregando motor RAG compartilhado...")
+            app.state.ecladatta = await asyncio.to_thread(EstadoServidor, snapshot=snapshot)
+        else:
+            app.state.ecladatta = estado
+        logger.info("✅ Servidor pronto.")
+        yield
+
+    app = FastAPI(title="ECLADATTA", lifespan=lifespan)
+
+    def _estado() -> EstadoServidor:
+        return app.state.ecladatta
+
+    @app.get("/health")
+    async def health():
+        from src.models.concurrency import obter_governador
+
+        return {"status": "ok", "fila": _estado().fila.estado(), "governador": obter_governador().metricas()}
+
+    @app.post("/retrieve")
+    async def retrieve(req: RecuperacaoRequest):
+        # Recuperação usa só o modelo de embeddings: não ocupa vaga do LLM
+        contexto = await _estado().recuperar(req.pergunta, req.filtros())
+        return {"pergunta": req.pergunta, "contexto": contexto}
+
+    @app.post("/ask")
+    async def ask(req: PerguntaRequest):
+        est = _estado()
+
+        # Pergunta factual simples: responde direto do FactStore, sem LLM
+        # (com os mesmos filtros de fonte/edição/páginas pedidos para a recuperação)
+        filtros_fatos = {c: v for c, v in req.filtros().items() if c != "k"}
+        fato = est.fatos.responder(req.pergunta, **filtros_fatos) if est.fatos is not None else None
+        if fato:
+            texto = est.fatos.formatar_resposta(fato)
+            if req.stream:
+                return StreamingResponse(iter([texto]), media_type="text/plain; charset=utf-8")
+            return {"resposta": texto, "contexto": None, "analise": None, "fato": fato}
+
+        contexto = await est.recuperar(req.pergunta, req.filtros())
+        entrada = {"context": contexto, "question": req.pergunta}
+
+        if not req.stream:
+            async with est.fila.vaga():
+                resposta = await est.resposta_chain.ainvoke(entrada)
+                analise = None
+                if req.verificar:
+                    analise = await asyncio.to_thread(
+                        est.verificador.verificar_consistencia_numerica, resposta, contexto
+                    )
+            return {"resposta": resposta, "contexto": contexto, "analise": analise}
+
+        # Streaming: a vaga é obtida antes de responder (um 503 depois do 1º byte não chega ao
+        # cliente) e ocupada enquanto os tokens são gerados. É liberada ao fim do gerador ou,
+        # se ele nunca chegar a rodar (cliente desconectou), pela tarefa de fundo.
+        vaga = AsyncExitStack()
+        await vaga.enter_async_context(est.fila.vaga())
+
+        async def gerar():
+            try:
+                async for pedaco in est.resposta_chain.astream(entrada):
+                    yield pedaco
+            finally:
+                await vaga.aclose()
+
+        return StreamingResponse(gerar(), media_type="text/plain; charset=utf-8",
+                                 background=BackgroundTask(vaga.aclose))
+
+    @app.post("/verify")
+    async def verify(req: VerificacaoRequest):
+        est = _estado()
+        async with est.fila.vaga():
+            analise = await asyncio.to_thread(
+                est.verificador.verificar_consistencia_numerica, req.resposta, req.contexto
+            )
+        return analise
+
+    @app.post("/extract")
+    async def extract(req: ExtracaoRequest):
+        est = _estado()
+        try:
+            async with est.fila.vaga():
+                # Saída restrita ao schema e já decodificada (reparada se veio truncada)
+                resultado = await est.extraction_chain.ainvoke({
+                    "texto_input": req.texto,
+                    "tabela_input": req.tabela
+                })
+        except OutputParserException as e:
+            raise HTTPException(status_code=502, detail=f"Saída do modelo não é JSON: {e}")
+
+        relacoes = resultado.get("relacoes", []) if isinstance(resultado, dict) else resultado
+
+        if req.salvar:
+            from src.evaluation.saver import salvar_relacoes_csv
+
+            await asyncio.to_thread(salvar_relacoes_csv, relacoes, req.fonte)
+
+        return {"relacoes": relacoes}
+
+    return app
+
+
+def iniciar_servidor(host: Optional[str] = None, porta: Optional[int] = None, snapshot: Optional[str] = None):
+    """Sobe o servidor com um único worker (um único motor aquecido por processo)."""
+    import uvicorn
+
+    uvicorn.run(criar_app(snapshot=snapshot), host=host or SERVER_HOST, port=porta or SERVER_PORT, workers=1)
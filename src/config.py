@@ -13,9 +13,44 @@ TEXTS_DIR = PROCESSED_DIR / "texts"
 TABLES_DIR = PROCESSED_DIR / "tables"
 SUMMARIES_DIR = PROCESSED_DIR / "summaries"
 VECTOR_DB_DIR = DATA_DIR / "vector_db"
+# Snapshots empacotados do índice (python main.py --exportar-snapshot)
+SNAPSHOTS_DIR = DATA_DIR / "snapshots"
+SNAPSHOT_PADRAO = SNAPSHOTS_DIR / "ecladatta.snap"
+# Cache de resumos endereçado por conteúdo (SQLite) e seu tamanho máximo
+SUMMARY_CACHE_DB = SUMMARIES_DIR / "summary_cache.sqlite"
+SUMMARY_CACHE_MAX_MB = 64
+# Fatos numéricos extraídos das tabelas (SQLite indexado)
+FACTS_DB = PROCESSED_DIR / "facts.sqlite"
+
+
+def garantir_diretorios(*paths: Path):
+    """
+    Cria os diretórios informados (ou todos os de dados, se nenhum for passado).
+    Chamado pelas etapas que escrevem em disco, e não na importação do módulo,
+    para que o chat não pague I/O desnecessário e para que a checagem de
+    existência do banco vetorial em main.py continue significativa.
+    """
+    for path in paths or (RAW_DIR, TEXTS_DIR, TABLES_DIR, SUMMARIES_DIR, VECTOR_DB_DIR):
+        path.mkdir(parents=True, exist_ok=True)
+
+
+# --- PIPELINE DE PÁGINAS (ingestão em streaming) ---
+# Tamanho e sobreposição (em caracteres) dos chunks de texto
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 150
+# Chunks aguardando gravação em disco; acima disso a extração pausa (backpressure)
+ESCRITA_FILA_MAX = 64
+
+# --- DEDUPLICAÇÃO DE CHUNKS (MinHash/LSH; descarta dentro da edição, registra entre edições) ---
+DEDUP_DB = PROCESSED_DIR / "dedup.sqlite"
+# Similaridade de Jaccard estimada a partir da qual um chunk é considerado duplicata
+DEDUP_LIMIAR = 0.85
+# Tamanho da assinatura MinHash e número de bandas do LSH (permutações % bandas == 0)
+DEDUP_PERMUTACOES = 64
+DEDUP_BANDAS = 16
+# Palavras por shingle
+DEDUP_SHINGLE = 5
 
-for path in [RAW_DIR, TEXTS_DIR, TABLES_DIR, SUMMARIES_DIR, VECTOR_DB_DIR]:
-    path.mkdir(parents=True, exist_ok=True)
 
 # --- CONFIGURAÇÃO DE MODELOS (ATUALIZADO PARA OLLAMA) ---
 
@@ -32,4 +67,31 @@ MODEL_NAME = "llama3"
 EMBEDDING_MODEL_NAME = "nomic-embed-text"
 
 # Configurações da OpenAI (Caso precise voltar)
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# --- ÍNDICE PARTICIONADO (um shard/coleção do Chroma por edição) ---
+# Shards consultados em paralelo por pergunta
+SHARD_MAX_WORKERS = int(os.getenv("ECLADATTA_SHARD_WORKERS", "4"))
+
+# --- GOVERNADOR DE CONCORRÊNCIA (todas as chamadas ao Ollama) ---
+# Limite adaptativo de chamadas simultâneas (inicial, mínimo e máximo).
+# O mínimo efetivo é 2: uma vaga reservada ao chat + ao menos uma para os jobs em lote.
+GOV_LIMITE_INICIAL = 2
+GOV_LIMITE_MIN = 1
+GOV_LIMITE_MAX = 8
+# Latência média acima de (linha de base x tolerância) reduz o limite
+GOV_TOLERANCIA_LATENCIA = 2.0
+
+# --- MICRO-LOTES DE EMBEDDING DE PERGUNTAS ---
+# Máximo de perguntas por chamada ao modelo de embeddings
+EMBED_LOTE_MAX = 32
+# Janela de coleta de perguntas concorrentes (milissegundos)
+EMBED_LOTE_ESPERA_MS = 5
+
+# --- SERVIDOR HTTP LOCAL (python main.py --servidor) ---
+SERVER_HOST = os.getenv("ECLADATTA_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("ECLADATTA_PORT", "8000"))
+# Requisições simultâneas enviadas ao servidor de modelos (Ollama)
+SERVER_MAX_CONCORRENCIA = int(os.getenv("ECLADATTA_MAX_CONCORRENCIA", "2"))
+# Requisições aguardando vaga; acima disso o servidor responde 503
+SERVER_MAX_FILA = int(os.getenv("ECLADATTA_MAX_FILA", "32"))
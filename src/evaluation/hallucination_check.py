@@ -1,10 +1,11 @@
 import re
 from typing import Dict, List
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
 
 # Importa a Fábrica em vez de importar o ChatOpenAI direto
-from src.models.llm_factory import LLMFactory
+from src.models.llm_factory import LLMFactory, ModeloGovernado
+from src.models.concurrency import PAPEL_VERIFICACAO
+from src.models.structured_output import GeradorJson, SCHEMA_JUIZ
 
 
 class VerificadorAlucinacao:
@@ -14,10 +15,16 @@ class VerificadorAlucinacao:
     [cite_start]Referência: Etapa 3 da Metodologia - Verificação de consistência[cite: 34, 36].
     """
 
-    def __init__(self):
+    def __init__(self, llm=None, fatos=None):
         # CORREÇÃO: Usa a Factory para pegar o modelo configurado (Ollama ou OpenAI)
         # temperature=0 é crucial para validação rigorosa
-        self.llm = LLMFactory.create_chat_model(temperature=0)
+        # Um LLM já criado (temperature=0) pode ser compartilhado, ex.: no modo servidor
+        # As chamadas do juiz usam a prioridade 'verificacao' no governador
+        if isinstance(llm, ModeloGovernado):
+            llm = llm.com_papel(PAPEL_VERIFICACAO)
+        self.llm = llm or LLMFactory.create_chat_model(temperature=0, papel=PAPEL_VERIFICACAO)
+        # FactStore opcional (src/ingestion/fact_store.py) para checagem exata contra células
+        self.fatos = fatos
 
         # Prompt de "Juiz" para validar fatos
         self.prompt_juiz = ChatPromptTemplate.from_template(
@@ -43,13 +50,31 @@ class VerificadorAlucinacao:
             }}
             """
         )
-        self.parser = JsonOutputParser()
+        # Saída restrita ao SCHEMA_JUIZ, cortada quando o JSON fecha e reparada se truncada
+        self.gerador = GeradorJson(self.llm, SCHEMA_JUIZ)
 
     def verificar_consistencia_numerica(self, resposta: str, contexto: str) -> Dict:
         """
         Verifica semanticamente se os números da resposta estão amparados pelo contexto.
+        Com FactStore, números que não existem em nenhuma célula das tabelas nem no
+        contexto recuperado são sinalizados direto, sem chamar o LLM juiz. O FactStore
+        nunca aprova sozinho: um número existir em alguma tabela não garante que seja
+        o da linha/coluna citada, então sem sinalização o juiz é chamado normalmente.
         """
-        chain = self.prompt_juiz | self.llm | self.parser
+        if self.fatos is not None:
+            # Comparação por valor: '16,1%' na resposta confere com '16,1 %' ou '16.1' no contexto
+            valores_contexto = self.valores_numericos(contexto)
+            ausentes = [n for n in self.verificar_numeros_em_fatos(resposta, self.fatos)
+                        if self._valor(n) not in valores_contexto]
+            if ausentes:
+                return {
+                    "tem_alucinacao": True,
+                    "numeros_incorretos": ausentes,
+                    "justificativa": "Números sem correspondência nas tabelas nem no contexto recuperado.",
+                    "metodo": "fatos",
+                }
+
+        chain = self.prompt_juiz | self.gerador
 
         try:
             # Invoca a cadeia de verificação
@@ -57,11 +82,56 @@ class VerificadorAlucinacao:
                 "contexto": contexto,
                 "resposta": resposta
             })
+            if not isinstance(resultado, dict) or not isinstance(resultado.get("tem_alucinacao"), bool):
+                raise ValueError(f"Veredito do juiz fora do schema: {resultado!r}")
+            resultado.setdefault("numeros_incorretos", [])
+            resultado["metodo"] = "llm"
             return resultado
         except Exception as e:
-            # Em caso de erro (ex: modelo local muito lento ou falha no JSON),
-            # retornamos um erro "suave" para não travar o chat.
-            return {"tem_alucinacao": False, "erro_validacao": str(e)}
+            # Falha fechada: sem veredito válido do juiz (ex: modelo local muito lento),
+            # cai na checagem determinística em vez de presumir que não há alucinação.
+            incorretos = self.verificar_regex_simples(resposta, contexto)
+            return {
+                "tem_alucinacao": bool(incorretos),
+                "numeros_incorretos": incorretos,
+                "justificativa": "Juiz indisponível; números da resposta conferidos literalmente no contexto.",
+                "metodo": "regex",
+                "erro_validacao": str(e),
+            }
+
+    @staticmethod
+    def extrair_numeros(texto: str) -> List[str]:
+        """Extrai números como 10, 10.5, 10,5, 10%, 1.234,5 do texto."""
+        return re.findall(r'\d+(?:[.,]\d+)*%?', texto)
+
+    @staticmethod
+    def _valor(numero: str):
+        """Valor normalizado de um número extraído (a própria string, se não for interpretável)."""
+        from src.ingestion.fact_store import interpretar_numero
+
+        interpretado = interpretar_numero(numero)
+        return numero if interpretado is None else round(interpretado[0], 6)
+
+    @classmethod
+    def valores_numericos(cls, texto: str) -> set:
+        """Valores normalizados de todos os números do texto (formatos BR/US, com ou sem %)."""
+        return {cls._valor(n) for n in cls.extrair_numeros(texto)}
+
+    @staticmethod
+    def verificar_numeros_em_fatos(resposta: str, fatos) -> List[str]:
+        """
+        Método determinístico contra o FactStore.
+        Retorna os números da resposta que não correspondem a nenhuma célula
+        (busca por valor no índice do SQLite, O(log n) por número).
+        """
+        from src.ingestion.fact_store import interpretar_numero
+
+        nao_encontrados = []
+        for num in VerificadorAlucinacao.extrair_numeros(resposta):
+            interpretado = interpretar_numero(num)
+            if interpretado is None or not fatos.existe_valor(interpretado[0]):
+                nao_encontrados.append(num)
+        return nao_encontrados
 
     @staticmethod
     def verificar_regex_simples(resposta: str, contexto: str) -> List[str]:
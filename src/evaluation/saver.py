@@ -1,24 +1,20 @@
 import csv
-import json
 import logging
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Union
 
 # Define o caminho do arquivo de saída
-from src.config import DATA_DIR
+from src.config import DATA_DIR, garantir_diretorios
 
 OUTPUTS_DIR = DATA_DIR.parent / "outputs"
 RELATIONS_FILE = OUTPUTS_DIR / "relations_extracted.csv"
 LOGS_DIR = OUTPUTS_DIR / "logs"
 
-# Garante que as pastas existam
-RELATIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
-
 
 def configurar_logger():
     """Configura o log para escrever tanto no arquivo quanto no console."""
+    garantir_diretorios(LOGS_DIR)
     log_filename = LOGS_DIR / f"execution_{datetime.now().strftime('%Y%m%d')}.log"
 
     logging.basicConfig(
@@ -32,33 +28,39 @@ def configurar_logger():
     return logging.getLogger("ECLADATTA")
 
 
-def salvar_relacoes_csv(relacoes: Union[str, List[Dict]], fonte: str):
+def salvar_relacoes_csv(relacoes: Union[str, Dict, List[Dict]], fonte: str):
     """
     Salva as relações extraídas no arquivo relations_extracted.csv.
-    Recebe uma lista de dicionários ou uma string JSON.
+    Recebe a saída da cadeia de extração ({"relacoes": [...]}), uma lista de
+    dicionários ou uma string JSON (com cercas Markdown ou truncada: é reparada).
     """
+    from src.models.structured_output import reparar_json, SCHEMA_RELACOES
+
     logger = logging.getLogger("ECLADATTA")
 
     # 1. Tenta converter string JSON para lista de dicts
     dados_para_salvar = []
     if isinstance(relacoes, str):
         try:
-            # Limpa blocos de código markdown se o LLM mandar ```json ... ```
-            relacoes_limpo = relacoes.replace("```json", "").replace("```", "").strip()
-            dados_para_salvar = json.loads(relacoes_limpo)
-        except json.JSONDecodeError as e:
+            dados_para_salvar = reparar_json(relacoes, SCHEMA_RELACOES)
+        except ValueError as e:
             logger.error(f"Falha ao decodificar JSON para salvar no CSV: {e}")
             return
-    elif isinstance(relacoes, list):
+    elif isinstance(relacoes, (list, dict)):
         dados_para_salvar = relacoes
     else:
         return
 
+    # Formato do schema de extração: {"relacoes": [...]}
+    if isinstance(dados_para_salvar, dict) and isinstance(dados_para_salvar.get("relacoes"), list):
+        dados_para_salvar = dados_para_salvar["relacoes"]
+
     # Se o JSON for um único dict, transforma em lista
     if isinstance(dados_para_salvar, dict):
         dados_para_salvar = [dados_para_salvar]
 
     # 2. Escreve no CSV
+    garantir_diretorios(RELATIONS_FILE.parent)
     arquivo_existe = RELATIONS_FILE.exists()
 
     with open(RELATIONS_FILE, mode='a', newline='', encoding='utf-8') as f:
@@ -71,6 +73,8 @@ def salvar_relacoes_csv(relacoes: Union[str, List[Dict]], fonte: str):
 
         count = 0
         for item in dados_para_salvar:
+            if not isinstance(item, dict):
+                continue
             # Adiciona metadados extras
             item['fonte'] = fonte
             item['data_extracao'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
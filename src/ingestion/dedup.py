@@ -0,0 +1,258 @@
+# Arquivo: src/ingestion/dedup.py
+import hashlib
+import re
+import sqlite3
+import struct
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+
+import numpy as np
+
+from src.config import (DEDUP_DB, DEDUP_LIMIAR, DEDUP_PERMUTACOES, DEDUP_BANDAS, DEDUP_SHINGLE,
+                        garantir_diretorios)
+
+# Hashes universais (a*x + b) mod P simulam as permutações. Com x, a, b < 2^32 o produto
+# cabe em uint64, e a assinatura inteira é calculada de uma vez com numpy.
+_PRIMO = (1 << 61) - 1
+_MASCARA_32 = (1 << 32) - 1
+
+PADRAO_PALAVRA = re.compile(r"\w+", re.UNICODE)
+PADRAO_NUMERO = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def _hash64(texto: str) -> int:
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class DeduplicadorMinHash:
+    """
+    Detector de chunks quase duplicados (MinHash + LSH) com índice persistente em SQLite.
+
+    Cada chunk limpo vira um conjunto de shingles de palavras; sua assinatura MinHash é
+    dividida em bandas (LSH) para achar candidatos sem comparar com todos os chunks já
+    vistos. Um candidato só conta se a similaridade estimada for >= `limiar` e se os
+    números do chunk forem exatamente os mesmos (boxes de metodologia se repetem; dados, não).
+
+    - Dentro da mesma edição (todos os PDFs ingeridos com o mesmo `edicao`), fica a primeira
+      cópia (canônica) e as demais viram apenas linhas de procedência: não são gravadas.
+    - Entre edições, o chunk repetido é gravado mesmo assim (cada edição é um shard que pode
+      ser removido ou re-indexado sozinho) e vira o canônico da sua edição; a repetição fica
+      registrada como procedência do canônico da edição em que apareceu primeiro.
+    """
+
+    def __init__(self, caminho: Union[str, Path] = DEDUP_DB, limiar: float = DEDUP_LIMIAR,
+                 permutacoes: int = DEDUP_PERMUTACOES, bandas: int = DEDUP_BANDAS,
+                 tamanho_shingle: int = DEDUP_SHINGLE):
+        if permutacoes % bandas:
+            raise ValueError("O número de permutações deve ser múltiplo do número de bandas.")
+        self.caminho = Path(caminho)
+        self.limiar = limiar
+        self.permutacoes = permutacoes
+        self.bandas = bandas
+        self.linhas_por_banda = permutacoes // bandas
+        self.tamanho_shingle = tamanho_shingle
+
+        # Coeficientes fixos (derivados do índice): assinaturas gravadas continuam comparáveis
+        self._a = np.array([(_hash64(f"a{i}") & _MASCARA_32) | 1 for i in range(permutacoes)],
+                           dtype=np.uint64)[:, None]
+        self._b = np.array([_hash64(f"b{i}") & _MASCARA_32 for i in range(permutacoes)], dtype=np.uint64)[:, None]
+        self._formato = struct.Struct(f"<{permutacoes}Q")
+
+        garantir_diretorios(self.caminho.parent)
+        self.conn = sqlite3.connect(str(self.caminho))
+        self._criar_schema()
+
+        self.execucao = None
+        self.edicao = None
+        self.origem = None
+        self.canonicos = 0
+        self.duplicatas = 0
+        self.repetidos = 0
+
+    def _criar_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS canonicos (
+                id TEXT PRIMARY KEY,
+                assinatura BLOB NOT NULL,
+                numeros TEXT NOT NULL,
+                origem TEXT,
+                edicao TEXT,
+                pagina INTEGER,
+                execucao TEXT
+            );
+            CREATE TABLE IF NOT EXISTS bandas (
+                banda INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                id_canonico TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS procedencia (
+                id_canonico TEXT NOT NULL,
+                origem TEXT,
+                edicao TEXT,
+                pagina INTEGER,
+                chunk INTEGER,
+                similaridade REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bandas ON bandas(banda, hash);
+            CREATE INDEX IF NOT EXISTS idx_bandas_canonico ON bandas(id_canonico);
+            CREATE INDEX IF NOT EXISTS idx_procedencia_canonico ON procedencia(id_canonico);
+            CREATE INDEX IF NOT EXISTS idx_procedencia_edicao ON procedencia(edicao);
+        """)
+
+    # --- ASSINATURAS ---
+
+    def shingles(self, texto: str) -> Set[str]:
+        palavras = PADRAO_PALAVRA.findall(texto.lower())
+        n = self.tamanho_shingle
+        if len(palavras) <= n:
+            return {" ".join(palavras)}
+        return {" ".join(palavras[i:i + n]) for i in range(len(palavras) - n + 1)}
+
+    def assinatura(self, texto: str) -> List[int]:
+        hashes = np.fromiter((_hash64(s) & _MASCARA_32 for s in self.shingles(texto)), dtype=np.uint64)
+        return ((self._a * hashes + self._b) % np.uint64(_PRIMO)).min(axis=1).tolist()
+
+    @staticmethod
+    def numeros(texto: str) -> str:
+        """Impressão dos números do chunk (ordem ignorada)."""
+        return "|".join(sorted(set(PADRAO_NUMERO.findall(texto))))
+
+    def _hashes_bandas(self, assinatura: List[int]) -> List[str]:
+        r = self.linhas_por_banda
+        return [
+            hashlib.blake2b(struct.pack(f"<{r}Q", *assinatura[i * r:(i + 1) * r]),
+                            digest_size=8).hexdigest()
+            for i in range(self.bandas)
+        ]
+
+    def similaridade(self, assinatura_a: List[int], assinatura_b: List[int]) -> float:
+        """Estimativa da similaridade de Jaccard pela fração de posições iguais."""
+        iguais = sum(1 for x, y in zip(assinatura_a, assinatura_b) if x == y)
+        return iguais / self.permutacoes
+
+    # --- EXECUÇÃO ---
+
+    def iniciar(self, edicao: str, origem: str = None):
+        """
+        Começa a ingestão do documento `origem` na `edicao`. A procedência antiga dele é
+        descartada e os canônicos que ele mesmo gerou antes podem ser reivindicados de novo
+        (re-processar o mesmo PDF não transforma os próprios chunks em duplicatas).
+        """
+        self.execucao = uuid.uuid4().hex
+        self.edicao = edicao
+        self.origem = origem
+        self.canonicos = 0
+        self.duplicatas = 0
+        self.repetidos = 0
+        with self.conn:
+            self.conn.execute("DELETE FROM procedencia WHERE edicao IS ? AND origem IS ?", (edicao, origem))
+
+    def registrar(self, id_chunk: str, texto: str, origem: str = None, edicao: str = None,
+                  pagina: int = None, chunk: int = None) -> Optional[str]:
+        """
+        Verifica o chunk contra o índice. Se for quase duplicata de um chunk da mesma edição,
+        grava a procedência e retorna o id do canônico (o chunk deve ser descartado). Senão,
+        registra o chunk como canônico da edição (com procedência do canônico de outra
+        edição, se repetir um) e retorna None.
+        """
+        edicao = edicao or self.edicao
+        origem = origem or self.origem
+        assinatura = self.assinatura(texto)
+        numeros = self.numeros(texto)
+        hashes = self._hashes_bandas(assinatura)
+
+        # Melhor candidato da própria edição e melhor de outras edições
+        local, externo = (None, 0.0), (None, 0.0)
+        for candidato in self._candidatos(hashes):
+            linha = self.conn.execute(
+                "SELECT assinatura, numeros, edicao, origem, execucao FROM canonicos WHERE id = ?", (candidato,)
+            ).fetchone()
+            if linha is None or linha[1] != numeros:
+                continue
+            sim = self.similaridade(assinatura, list(self._formato.unpack(linha[0])))
+            if sim < self.limiar:
+                continue
+            if linha[2] == edicao:
+                if sim > local[1]:
+                    local = ((candidato, linha[3], linha[4]), sim)
+            elif sim > externo[1]:
+                externo = (candidato, sim)
+
+        (melhor, melhor_sim) = local
+        if melhor is not None:
+            id_canonico, origem_canonico, execucao_canonico = melhor
+            if origem_canonico == origem and execucao_canonico != self.execucao:
+                # Canônico de uma ingestão anterior deste mesmo documento: o chunk novo assume o lugar
+                self._substituir_canonico(id_canonico, id_chunk)
+            else:
+                self._gravar_procedencia(id_canonico, origem, edicao, pagina, chunk, melhor_sim)
+                self.duplicatas += 1
+                return id_canonico
+
+        self.conn.execute(
+            "INSERT INTO canonicos (id, assinatura, numeros, origem, edicao, pagina, execucao) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (id_chunk, self._formato.pack(*assinatura), numeros, origem, edicao, pagina, self.execucao))
+        self.conn.executemany(
+            "INSERT INTO bandas (banda, hash, id_canonico) VALUES (?, ?, ?)",
+            [(i, h, id_chunk) for i, h in enumerate(hashes)])
+        self.canonicos += 1
+
+        id_externo, sim_externo = externo
+        if id_externo is not None:
+            self._gravar_procedencia(id_externo, origem, edicao, pagina, chunk, sim_externo)
+            self.repetidos += 1
+        return None
+
+    def _gravar_procedencia(self, id_canonico: str, origem: str, edicao: str, pagina: int, chunk: int,
+                            similaridade: float):
+        self.conn.execute(
+            "INSERT INTO procedencia (id_canonico, origem, edicao, pagina, chunk, similaridade) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (id_canonico, origem, edicao, pagina, chunk, round(similaridade, 4)))
+
+    def _substituir_canonico(self, id_antigo: str, id_novo: str):
+        """Remove o canônico antigo do índice; a procedência dele passa a apontar para o novo."""
+        self.conn.execute("DELETE FROM canonicos WHERE id = ?", (id_antigo,))
+        self.conn.execute("DELETE FROM bandas WHERE id_canonico = ?", (id_antigo,))
+        self.conn.execute("UPDATE procedencia SET id_canonico = ? WHERE id_canonico = ?", (id_novo, id_antigo))
+
+    def _candidatos(self, hashes: List[str]) -> List[str]:
+        candidatos = []
+        for i, h in enumerate(hashes):
+            for (id_canonico,) in self.conn.execute(
+                    "SELECT id_canonico FROM bandas WHERE banda = ? AND hash = ?", (i, h)):
+                if id_canonico not in candidatos:
+                    candidatos.append(id_canonico)
+        return candidatos
+
+    def remover_edicao(self, edicao: str):
+        """
+        Apaga do índice os canônicos e a procedência de `edicao` (shard removido). As outras
+        edições não perdem texto: repetições entre edições sempre têm o próprio canônico.
+        """
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM bandas WHERE id_canonico IN (SELECT id FROM canonicos WHERE edicao = ?)", (edicao,))
+            self.conn.execute(
+                "DELETE FROM procedencia WHERE edicao = ? "
+                "OR id_canonico IN (SELECT id FROM canonicos WHERE edicao = ?)", (edicao, edicao))
+            self.conn.execute("DELETE FROM canonicos WHERE edicao = ?", (edicao,))
+
+    # --- CONSULTA ---
+
+    def procedencia(self, id_canonico: str) -> List[Dict]:
+        """
+        Onde mais (origem, edição, página) o conteúdo do chunk canônico aparece: cópias
+        descartadas da mesma edição e repetições (gravadas) em outras edições.
+        """
+        cursor = self.conn.execute(
+            "SELECT origem, edicao, pagina, chunk, similaridade FROM procedencia WHERE id_canonico = ? "
+            "ORDER BY edicao, pagina, chunk", (id_canonico,))
+        colunas = [c[0] for c in cursor.description]
+        return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+    def fechar(self):
+        self.conn.commit()
+        self.conn.close()
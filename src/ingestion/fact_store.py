@@ -0,0 +1,336 @@
+# Arquivo: src/ingestion/fact_store.py
+import csv
+import io
+import json
+import re
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.config import TABLES_DIR, FACTS_DB, garantir_diretorios
+
+
+# Mesmo rótulo de modalidade usado nos metadados do índice (src/models/rag_engine.py)
+MODALIDADE_TABELA = "tabela"
+
+# Número no padrão brasileiro (1.234,5) ou simples (10.5 / 10), com sinal ou parênteses
+PADRAO_NUMERO = re.compile(r'\(?-?\d[\d.,]*\)?')
+
+UNIDADES = [
+    ("p.p.", "p.p."),
+    ("%", "%"),
+    ("r$", "R$"),
+    ("us$", "US$"),
+    ("bilh", "bi"),
+    ("milh", "mi"),
+    (" bi", "bi"),
+    (" mi", "mi"),
+]
+
+
+# Perguntas que pedem explicação/análise vão ao LLM, mesmo que citem uma célula
+PALAVRAS_EXPLICATIVAS = {
+    "explique", "explica", "explicar", "por que", "porque", "como", "analise", "analisar",
+    "compare", "comparar", "descreva", "descrever", "comente", "avalie", "avaliar",
+    "riscos", "motivos", "causas", "impacto", "impactos", "tendencia", "justifique",
+}
+# Pergunta de consulta direta: curta
+MAX_PALAVRAS_CONSULTA = 12
+
+
+def normalizar_rotulo(texto: str) -> str:
+    """Minúsculas, sem acentos e com pontuação irrelevante trocada por espaço."""
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = re.sub(r"[^\w/%.,$]+", " ", texto)
+    # Ponto/vírgula só são mantidos entre dígitos (ex: '10,5'), não como pontuação
+    texto = re.sub(r"(?<!\d)[.,]|[.,](?!\d)", " ", texto)
+    return re.sub(r"\s+", " ", texto).strip()
+
+
+def interpretar_numero(celula: str) -> Optional[Tuple[float, str]]:
+    """
+    Converte uma célula em (valor, unidade). Retorna None se não for numérica.
+    Ex: '1.234,5' -> (1234.5, ''), '12,3%' -> (12.3, '%'), '(2,1)' -> (-2.1, '').
+    """
+    texto = str(celula or "").strip()
+    m = PADRAO_NUMERO.search(texto)
+    if not m:
+        return None
+
+    bruto = m.group(0)
+    negativo = (bruto.startswith("(") and bruto.endswith(")")) or "-" in bruto
+    numero = bruto.strip("()").replace("-", "").rstrip(".,")
+
+    if "," in numero:
+        # Padrão BR: ponto = milhar, vírgula = decimal
+        numero = numero.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", numero):
+        numero = numero.replace(".", "")
+
+    try:
+        valor = float(numero)
+    except ValueError:
+        return None
+
+    # Célula predominantemente textual (ex: 'Tabela 3 - Crédito') não é fato numérico
+    resto = texto.replace(bruto, "").strip()
+    if len(re.sub(r"[^a-zA-ZÀ-ú]", "", resto)) > 3 and not any(u in resto.lower() for u, _ in UNIDADES):
+        return None
+
+    unidade = ""
+    texto_lower = f" {texto.lower()}"
+    for marcador, nome in UNIDADES:
+        if marcador in texto_lower:
+            unidade = nome
+            break
+
+    return (-valor if negativo else valor), unidade
+
+
+class FactStore:
+    """
+    Armazena fatos numéricos normalizados extraídos das tabelas:
+    (id_tabela, linha, coluna, valor, unidade, página).
+
+    Os fatos ficam num SQLite local com índices em `valor` e em (linha, coluna),
+    permitindo verificar um número contra células exatas em O(log n) e responder
+    perguntas factuais simples sem chamar o LLM.
+    """
+
+    def __init__(self, caminho: Union[str, Path] = FACTS_DB):
+        self.caminho = Path(caminho)
+        garantir_diretorios(self.caminho.parent)
+        self.conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._criar_schema()
+        self._rotulos_cache = None
+
+    def _criar_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fatos (
+                id INTEGER PRIMARY KEY,
+                id_tabela TEXT NOT NULL,
+                fonte TEXT,
+                edicao TEXT,
+                pagina INTEGER,
+                linha TEXT,
+                linha_norm TEXT,
+                coluna TEXT,
+                coluna_norm TEXT,
+                valor REAL NOT NULL,
+                valor_texto TEXT,
+                unidade TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_fatos_valor ON fatos(valor);
+            CREATE INDEX IF NOT EXISTS idx_fatos_linha_coluna ON fatos(linha_norm, coluna_norm);
+            CREATE INDEX IF NOT EXISTS idx_fatos_tabela ON fatos(id_tabela);
+        """)
+
+    # --- CONSTRUÇÃO ---
+
+    @staticmethod
+    def extrair_fatos(dados_tabela: Dict) -> List[Dict]:
+        """
+        Converte o `conteudo_csv` de uma tabela em fatos.
+        1ª linha = cabeçalho das colunas; 1ª coluna = rótulo da linha.
+        Em tabelas costuradas, cada fato leva a página da sua linha (`paginas_linhas`).
+        """
+        conteudo = dados_tabela.get("conteudo_csv") or ""
+        linhas = [l for l in csv.reader(io.StringIO(conteudo)) if any(c.strip() for c in l)]
+        if len(linhas) < 2:
+            return []
+
+        cabecalho = [c.strip() for c in linhas[0]]
+        try:
+            pagina = int(dados_tabela.get("pagina"))
+        except (TypeError, ValueError):
+            pagina = None
+
+        paginas_linhas = dados_tabela.get("paginas_linhas") or []
+        if len(paginas_linhas) != len(linhas):
+            paginas_linhas = [pagina] * len(linhas)
+
+        fatos = []
+        for linha, pagina_linha in zip(linhas[1:], paginas_linhas[1:]):
+            rotulo = linha[0].strip() if linha else ""
+            if not rotulo:
+                continue
+            for j, celula in enumerate(linha[1:], start=1):
+                numero = interpretar_numero(celula)
+                if numero is None:
+                    continue
+                coluna = cabecalho[j] if j < len(cabecalho) else ""
+                valor, unidade = numero
+                fatos.append({
+                    "id_tabela": dados_tabela.get("id_tabela") or dados_tabela.get("id"),
+                    "fonte": dados_tabela.get("origem") or dados_tabela.get("source"),
+                    "edicao": dados_tabela.get("edicao"),
+                    "pagina": pagina_linha,
+                    "linha": rotulo,
+                    "linha_norm": normalizar_rotulo(rotulo),
+                    "coluna": coluna,
+                    "coluna_norm": normalizar_rotulo(coluna),
+                    "valor": valor,
+                    "valor_texto": celula.strip(),
+                    "unidade": unidade,
+                })
+        return fatos
+
+    def inserir_tabela(self, dados_tabela: Dict) -> int:
+        """Substitui os fatos de uma tabela (re-ingestão idempotente). Retorna quantos foram gravados."""
+        fatos = self.extrair_fatos(dados_tabela)
+        id_tabela = dados_tabela.get("id_tabela") or dados_tabela.get("id")
+        with self.conn:
+            self.conn.execute("DELETE FROM fatos WHERE id_tabela = ?", (id_tabela,))
+            self.conn.executemany(
+                """INSERT INTO fatos (id_tabela, fonte, edicao, pagina, linha, linha_norm,
+                                      coluna, coluna_norm, valor, valor_texto, unidade)
+                   VALUES (:id_tabela, :fonte, :edicao, :pagina, :linha, :linha_norm,
+                           :coluna, :coluna_norm, :valor, :valor_texto, :unidade)""",
+                fatos,
+            )
+        self._rotulos_cache = None
+        return len(fatos)
+
+    def remover_edicao(self, edicao: str) -> int:
+        """Apaga os fatos de uma edição (shard removido). Retorna quantos foram apagados."""
+        with self.conn:
+            apagados = self.conn.execute("DELETE FROM fatos WHERE edicao = ?", (edicao,)).rowcount
+        self._rotulos_cache = None
+        return apagados
+
+    # --- CONSULTA ---
+
+    def buscar(self, linha: str = None, coluna: str = None, id_tabela: str = None,
+               edicao: Union[str, List[str], None] = None, fonte: Union[str, List[str], None] = None,
+               pagina_min: int = None, pagina_max: int = None) -> List[Dict]:
+        """
+        Busca fatos por rótulo de linha/coluna (comparação normalizada e exata).
+        Edição/fonte aceitam um valor ou lista; páginas restringem por intervalo.
+        """
+        condicoes, params = [], []
+        for campo, valor in (("linha_norm", normalizar_rotulo(linha) if linha else None),
+                             ("coluna_norm", normalizar_rotulo(coluna) if coluna else None),
+                             ("id_tabela", id_tabela), ("edicao", edicao), ("fonte", fonte)):
+            if valor is None:
+                continue
+            if isinstance(valor, (list, tuple, set)):
+                valor = list(valor)
+                condicoes.append(f"{campo} IN ({', '.join('?' * len(valor))})")
+                params.extend(valor)
+            else:
+                condicoes.append(f"{campo} = ?")
+                params.append(valor)
+        if pagina_min is not None:
+            condicoes.append("pagina >= ?")
+            params.append(int(pagina_min))
+        if pagina_max is not None:
+            condicoes.append("pagina <= ?")
+            params.append(int(pagina_max))
+
+        sql = "SELECT * FROM fatos"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def existe_valor(self, valor: float, tolerancia: float = 1e-6) -> bool:
+        """True se alguma célula tem exatamente este valor (busca por intervalo no índice)."""
+        cur = self.conn.execute(
+            "SELECT 1 FROM fatos WHERE valor BETWEEN ? AND ? LIMIT 1",
+            (valor - tolerancia, valor + tolerancia),
+        )
+        return cur.fetchone() is not None
+
+    def _rotulos(self) -> Tuple[List[str], List[str]]:
+        if self._rotulos_cache is None:
+            linhas = [r[0] for r in self.conn.execute("SELECT DISTINCT linha_norm FROM fatos") if r[0]]
+            colunas = [r[0] for r in self.conn.execute("SELECT DISTINCT coluna_norm FROM fatos") if r[0]]
+            self._rotulos_cache = (linhas, colunas)
+        return self._rotulos_cache
+
+    @staticmethod
+    def pergunta_de_consulta(pergunta_norm: str) -> bool:
+        """Só perguntas curtas de consulta direta (sem pedido de explicação) usam o atalho."""
+        if len(pergunta_norm.split()) > MAX_PALAVRAS_CONSULTA:
+            return False
+        return not any(f" {p} " in f" {pergunta_norm} " for p in PALAVRAS_EXPLICATIVAS)
+
+    @staticmethod
+    def coluna_especifica(coluna_norm: str) -> bool:
+        """
+        Cabeçalhos genéricos ('2023', 'total') aparecem em quase toda pergunta e não
+        identificam a célula: exige rótulo composto (ex: 'dez/2023') ou longo.
+        """
+        partes = [p for p in re.split(r"[\s/]+", coluna_norm) if p]
+        if len(partes) >= 2:
+            return True
+        return len(coluna_norm) >= 6 and any(c.isalpha() for c in coluna_norm)
+
+    def responder(self, pergunta: str, fonte: Union[str, List[str], None] = None,
+                  edicao: Union[str, List[str], None] = None, modalidade: Union[str, List[str], None] = None,
+                  pagina_min: int = None, pagina_max: int = None) -> Optional[Dict]:
+        """
+        Tenta responder uma pergunta factual simples (ex: 'índice de Basileia em dez/2023')
+        sem LLM: procura o rótulo de linha mais longo e um cabeçalho de coluna específico
+        citados na pergunta, respeitando os mesmos filtros da recuperação (fonte, edição,
+        páginas). Só responde se o valor encontrado for único; caso contrário retorna None.
+        """
+        if modalidade is not None and MODALIDADE_TABELA not in (
+                modalidade if isinstance(modalidade, (list, tuple, set)) else [modalidade]):
+            return None
+
+        pergunta_norm = normalizar_rotulo(pergunta)
+        if not self.pergunta_de_consulta(pergunta_norm):
+            return None
+        pergunta_norm = f" {pergunta_norm} "
+        linhas, colunas = self._rotulos()
+
+        linhas_citadas = [l for l in linhas if len(l) >= 3 and f" {l} " in pergunta_norm]
+        colunas_citadas = [c for c in colunas if self.coluna_especifica(c) and f" {c} " in pergunta_norm]
+        if not linhas_citadas or not colunas_citadas:
+            return None
+
+        melhor_linha = max(linhas_citadas, key=len)
+        candidatos = []
+        for coluna in colunas_citadas:
+            candidatos.extend(self.buscar(linha=melhor_linha, coluna=coluna, edicao=edicao, fonte=fonte,
+                                          pagina_min=pagina_min, pagina_max=pagina_max))
+
+        valores = {c["valor"] for c in candidatos}
+        if len(valores) != 1:
+            return None
+        return candidatos[0]
+
+    @staticmethod
+    def formatar_resposta(fato: Dict) -> str:
+        return (f"{fato['linha']} — {fato['coluna']}: {fato['valor_texto']} "
+                f"(tabela {fato['id_tabela']}, pág. {fato['pagina']}, {fato['fonte']})")
+
+    def fechar(self):
+        self.conn.close()
+
+
+def construir_fatos_tabelas(caminho_db: Union[str, Path] = FACTS_DB) -> int:
+    """
+    Etapa de ingestão: lê os JSONs de tabelas e popula o FactStore.
+    Retorna o total de fatos gravados.
+    """
+    arquivos_tabela = list(TABLES_DIR.glob("*.json"))
+    if not arquivos_tabela:
+        print(f"⚠️ Nenhuma tabela encontrada em {TABLES_DIR}.")
+        return 0
+
+    store = FactStore(caminho_db)
+    total = 0
+    for arquivo in arquivos_tabela:
+        try:
+            with open(arquivo, "r", encoding="utf-8") as f:
+                total += store.inserir_tabela(json.load(f))
+        except Exception as e:
+            print(f"   ❌ Erro ao extrair fatos de {arquivo.name}: {e}")
+    store.fechar()
+
+    print(f"   [OK] {total} fatos numéricos indexados em {caminho_db}")
+    return total
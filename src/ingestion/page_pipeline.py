@@ -0,0 +1,193 @@
+# Arquivo: src/ingestion/page_pipeline.py
+import json
+import os
+import queue
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from src.config import TEXTS_DIR, CHUNK_SIZE, CHUNK_OVERLAP, ESCRITA_FILA_MAX
+from src.ingestion.text_cleaner import TextCleaner
+
+# A cada N páginas o cache de objetos do pdfminer é descartado e a memória reportada
+INTERVALO_LIMPEZA = 25
+
+_FIM = object()
+
+
+def rss_atual_mb() -> Optional[float]:
+    """Memória residente (RSS) atual do processo em MB, quando o SO permite medir."""
+    try:
+        with open("/proc/self/statm") as f:
+            paginas_residentes = int(f.read().split()[1])
+        return paginas_residentes * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss é o pico (KB no Linux), usado como aproximação
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+# --- ESTÁGIOS (GERADORES) ---
+
+def extrair_paginas(caminho_pdf: Union[str, Path]) -> Iterator[Tuple[int, str]]:
+    """
+    Estágio 1: produz (numero_pagina, texto_bruto) uma página por vez.
+    Após extrair cada página, os caches de layout dela são liberados, e o cache de
+    objetos do documento é descartado periodicamente, mantendo a memória constante.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(caminho_pdf) as pdf:
+        for i, pagina in enumerate(pdf.pages):
+            try:
+                texto_bruto = pagina.extract_text()
+            finally:
+                pagina.close()  # flush_cache(): descarta chars/linhas/layout da página
+
+            if (i + 1) % INTERVALO_LIMPEZA == 0:
+                cache_objetos = getattr(pdf.doc, "_cached_objs", None)
+                if isinstance(cache_objetos, dict):
+                    cache_objetos.clear()
+
+            yield i + 1, texto_bruto
+
+
+def limpar_paginas(paginas: Iterator[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+    """Estágio 2: aplica o TextCleaner e descarta páginas vazias."""
+    for numero, texto_bruto in paginas:
+        if texto_bruto:
+            texto_limpo = TextCleaner.processar(texto_bruto)
+            if texto_limpo:
+                yield numero, texto_limpo
+
+
+def fatiar_paginas(paginas: Iterator[Tuple[int, str]], tamanho: int = CHUNK_SIZE,
+                   sobreposicao: int = CHUNK_OVERLAP) -> Iterator[Tuple[int, int, str]]:
+    """Estágio 3: divide cada página em chunks (numero_pagina, indice_chunk, texto)."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=tamanho, chunk_overlap=sobreposicao)
+    for numero, texto in paginas:
+        for j, chunk in enumerate(splitter.split_text(texto)):
+            yield numero, j, chunk
+
+
+# --- ESCRITOR COM BACKPRESSURE ---
+
+class EscritorChunks:
+    """
+    Estágio 4: grava os chunks em JSON numa thread separada.
+    A fila é limitada (ESCRITA_FILA_MAX): se o disco ficar para trás, `enviar` bloqueia
+    e a extração pausa, em vez de acumular páginas na memória.
+    """
+
+    def __init__(self, destino: Path = TEXTS_DIR, tamanho_fila: int = ESCRITA_FILA_MAX):
+        self.destino = Path(destino)
+        self.fila = queue.Queue(maxsize=tamanho_fila)
+        self.gravados = 0
+        self._erro = None
+        self._thread = threading.Thread(target=self._consumir, name="escritor-chunks", daemon=True)
+        self._thread.start()
+
+    def _consumir(self):
+        while True:
+            item = self.fila.get()
+            if item is _FIM:
+                return
+            if self._erro is not None:
+                continue  # Drena a fila para não travar o produtor
+            try:
+                nome_json, dados = item
+                with open(self.destino / nome_json, 'w', encoding='utf-8') as f:
+                    json.dump(dados, f, ensure_ascii=False, indent=4)
+                self.gravados += 1
+            except Exception as e:
+                self._erro = e
+
+    def enviar(self, nome_json: str, dados: Dict):
+        if self._erro is not None:
+            raise self._erro
+        self.fila.put((nome_json, dados))  # Bloqueia quando a fila está cheia
+
+    def fechar(self):
+        self.fila.put(_FIM)
+        self._thread.join()
+        if self._erro is not None:
+            raise self._erro
+
+
+# --- ORQUESTRAÇÃO ---
+
+def processar_paginas(caminho_pdf: Union[str, Path], nome_arquivo: str, edicao: str,
+                      destino: Path = TEXTS_DIR, deduplicar: bool = True) -> Dict:
+    """
+    Pipeline extrair -> limpar -> fatiar -> deduplicar -> gravar, página a página.
+    O pico de memória não depende do número de páginas do PDF.
+    Chunks quase duplicados de outros já vistos nos PDFs da mesma `edicao` não são gravados;
+    repetições de outras edições são gravadas e só registradas (ver src/ingestion/dedup.py).
+    Retorna estatísticas: páginas lidas, chunks gravados, duplicatas descartadas, repetidos de
+    outras edições e RSS inicial/pico (MB).
+    """
+    rss_inicial = rss_atual_mb()
+    rss_pico = rss_inicial
+    paginas_lidas = 0
+
+    def _contar(paginas):
+        nonlocal paginas_lidas, rss_pico
+        for numero, texto in paginas:
+            paginas_lidas = numero
+            if numero % INTERVALO_LIMPEZA == 0:
+                rss = rss_atual_mb()
+                if rss is not None:
+                    rss_pico = max(rss_pico or 0, rss)
+                    print(f"   ... {numero} páginas processadas (RSS: {rss:.0f} MB)")
+            yield numero, texto
+
+    dedup = None
+    if deduplicar:
+        from src.ingestion.dedup import DeduplicadorMinHash
+
+        dedup = DeduplicadorMinHash()
+        dedup.iniciar(edicao, nome_arquivo)
+
+    escritor = EscritorChunks(destino)
+    try:
+        chunks = fatiar_paginas(limpar_paginas(_contar(extrair_paginas(caminho_pdf))))
+        for numero, j, texto in chunks:
+            id_chunk = str(uuid.uuid4())
+            if dedup is not None and dedup.registrar(id_chunk, texto, origem=nome_arquivo, edicao=edicao,
+                                                     pagina=numero, chunk=j):
+                continue
+            dados_texto = {
+                "id": id_chunk,
+                "pagina": numero,
+                "chunk": j,
+                "origem": nome_arquivo,
+                "edicao": edicao,
+                "conteudo": texto,
+                "tipo": "texto_narrativo"
+            }
+            escritor.enviar(f"text_pg{numero}_{j}_{dados_texto['id'][:8]}.json", dados_texto)
+    finally:
+        escritor.fechar()
+        if dedup is not None:
+            dedup.fechar()
+
+    rss_final = rss_atual_mb()
+    if rss_final is not None:
+        rss_pico = max(rss_pico or 0, rss_final)
+
+    return {
+        "paginas": paginas_lidas,
+        "chunks": escritor.gravados,
+        "duplicatas": dedup.duplicatas if dedup is not None else 0,
+        "repetidos": dedup.repetidos if dedup is not None else 0,
+        "rss_inicial_mb": rss_inicial,
+        "rss_pico_mb": rss_pico,
+    }
@@ -1,60 +1,58 @@
-import pdfplumber
-import json
-import uuid
 from pathlib import Path
-from src.config import RAW_DIR, TEXTS_DIR, TABLES_DIR
-from src.ingestion.text_cleaner import TextCleaner
+from src.config import RAW_DIR, TEXTS_DIR, TABLES_DIR, garantir_diretorios
 from src.ingestion.table_extractor import TableExtractor
+from src.ingestion.table_postprocess import TablePostProcessor
+from src.ingestion.page_pipeline import processar_paginas
 
 
-def processar_documento(nome_arquivo: str):
+def processar_documento(nome_arquivo: str, edicao: str = None):
     """
     Função principal da Etapa 1: Ingestão.
     Lê o PDF, extrai tabelas (Camelot) e textos (pdfplumber), limpa e salva.
+    O texto passa pelo pipeline de páginas em streaming (src/ingestion/page_pipeline.py).
+
+    Args:
+        nome_arquivo: PDF dentro de RAW_DIR.
+        edicao: Identificador da edição do relatório (ex: '2023-2S'). PDFs com a mesma
+                edição formam um único shard e são deduplicados entre si.
+                Se omitido, usa o nome do arquivo sem extensão.
     """
     caminho_pdf = RAW_DIR / nome_arquivo
     if not caminho_pdf.exists():
         raise FileNotFoundError(f"Arquivo {nome_arquivo} não encontrado em {RAW_DIR}")
 
+    edicao = edicao or Path(nome_arquivo).stem
+
     print(f"--- Iniciando Processamento: {nome_arquivo} ---")
+    garantir_diretorios(TEXTS_DIR, TABLES_DIR)
 
     # 1. Extração de Tabelas (Prioridade alta para garantir integridade estrutural )
     extrator_tabelas = TableExtractor()
     lista_tabelas = extrator_tabelas.extrair_com_camelot(caminho_pdf)
 
-    # Salva tabelas
+    # Costura tabelas multipágina e remove duplicatas antes de resumir/indexar
+    lista_tabelas = TablePostProcessor.processar(lista_tabelas)
+
+    # Salva tabelas (id prefixado pela edição: tab_{pagina}_{i} se repete entre PDFs)
     for tab in lista_tabelas:
+        tab['id_tabela'] = f"{edicao}__{tab['id_tabela']}"
         tab['origem'] = nome_arquivo
+        tab['edicao'] = edicao
         extrator_tabelas.salvar_tabela(tab, TABLES_DIR)
 
     print(f"   [OK] {len(lista_tabelas)} tabelas extraídas e salvas.")
 
-    # 2. Extração de Texto (Excluindo a área das tabelas se possível, ou bruto)
+    # 2. Extração de Texto em streaming (uma página por vez, memória constante)
     print(f"   Extraindo textos com pdfplumber...")
-
-    with pdfplumber.open(caminho_pdf) as pdf:
-        for i, pagina in enumerate(pdf.pages):
-            # Extrai texto cru
-            texto_bruto = pagina.extract_text()
-
-            if texto_bruto:
-                # Aplica a limpeza definida em text_cleaner.py
-                texto_limpo = TextCleaner.processar(texto_bruto)
-
-                # Prepara objeto JSON
-                dados_texto = {
-                    "id": str(uuid.uuid4()),
-                    "pagina": i + 1,
-                    "origem": nome_arquivo,
-                    "conteudo": texto_limpo,
-                    "tipo": "texto_narrativo"
-                }
-
-                # Salva texto
-                nome_json = f"text_pg{i + 1}_{dados_texto['id'][:8]}.json"
-                with open(TEXTS_DIR / nome_json, 'w', encoding='utf-8') as f:
-                    json.dump(dados_texto, f, ensure_ascii=False, indent=4)
-
+    stats = processar_paginas(caminho_pdf, nome_arquivo, edicao, TEXTS_DIR)
+
+    if stats["duplicatas"]:
+        print(f"   [OK] {stats['duplicatas']} chunks quase duplicados descartados (procedência em dedup.sqlite)")
+    if stats["repetidos"]:
+        print(f"   [OK] {stats['repetidos']} chunks repetidos de outras edições (mantidos; procedência em dedup.sqlite)")
+    if stats["rss_pico_mb"] is not None:
+        print(f"   [OK] {stats['paginas']} páginas -> {stats['chunks']} chunks "
+              f"(RSS inicial: {stats['rss_inicial_mb']:.0f} MB, pico: {stats['rss_pico_mb']:.0f} MB)")
     print(f"   [OK] Textos processados e salvos em {TEXTS_DIR}")
     print("--- Fim da Etapa 1 ---")
 
@@ -0,0 +1,106 @@
+# Arquivo: src/ingestion/summary_cache.py
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from src.config import SUMMARY_CACHE_DB, SUMMARY_CACHE_MAX_MB, MODEL_NAME, garantir_diretorios
+
+
+def conteudo_tabela(dados_tabela: Dict) -> str:
+    """
+    Conteúdo enviado ao LLM para resumir a tabela.
+    Algumas tabelas podem vir com chaves diferentes dependendo se vieram do camelot ou unstructured.
+    """
+    return (dados_tabela.get("conteudo_html") or dados_tabela.get("conteudo_csv")
+            or dados_tabela.get("content") or str(dados_tabela))
+
+
+class SummaryCache:
+    """
+    Cache de resumos de tabelas endereçado por conteúdo.
+
+    A chave é o hash de (conteúdo normalizado, versão do prompt, nome do modelo):
+    tabelas idênticas em PDFs/edições diferentes reaproveitam o mesmo resumo, e
+    tabelas diferentes com o mesmo id (tab_{pagina}_{i}) nunca colidem.
+    Tudo fica num único SQLite; acima de `max_mb` os itens menos acessados são removidos.
+    """
+
+    def __init__(self, caminho: Union[str, Path] = SUMMARY_CACHE_DB, max_mb: float = SUMMARY_CACHE_MAX_MB):
+        self.caminho = Path(caminho)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        garantir_diretorios(self.caminho.parent)
+        self.conn = sqlite3.connect(str(self.caminho), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS resumos (
+                    chave TEXT PRIMARY KEY,
+                    resumo TEXT NOT NULL,
+                    modelo TEXT,
+                    versao_prompt TEXT,
+                    tamanho INTEGER NOT NULL,
+                    criado_em REAL,
+                    acessado_em REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_resumos_acesso ON resumos(acessado_em);
+            """)
+        self.acertos = 0
+        self.faltas = 0
+
+    @staticmethod
+    def normalizar(conteudo: str) -> str:
+        return re.sub(r"\s+", " ", conteudo or "").strip()
+
+    @classmethod
+    def chave(cls, conteudo: str, versao_prompt: str, modelo: str) -> str:
+        texto = f"{cls.normalizar(conteudo)}\x00{versao_prompt}\x00{modelo}"
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def chave_tabela(cls, dados_tabela: Dict, modelo: str = MODEL_NAME) -> str:
+        """Chave de uma tabela com a versão atual do prompt 'resumo_tabela'."""
+        from src.prompts.templates import versao_prompt
+
+        return cls.chave(conteudo_tabela(dados_tabela), versao_prompt("resumo_tabela"), modelo)
+
+    def obter(self, chave: str) -> Optional[str]:
+        with self._lock:
+            linha = self.conn.execute("SELECT resumo FROM resumos WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                self.faltas += 1
+                return None
+            with self.conn:
+                self.conn.execute("UPDATE resumos SET acessado_em = ? WHERE chave = ?", (time.time(), chave))
+            self.acertos += 1
+            return linha[0]
+
+    def salvar(self, chave: str, resumo: str, modelo: str = MODEL_NAME, versao: str = None):
+        agora = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                """INSERT OR REPLACE INTO resumos
+                   (chave, resumo, modelo, versao_prompt, tamanho, criado_em, acessado_em)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (chave, resumo, modelo, versao, len(resumo.encode("utf-8")), agora, agora),
+            )
+            self._despejar()
+
+    def _despejar(self):
+        """Remove os resumos menos acessados até o cache caber em `max_bytes`."""
+        total = self.conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM resumos").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excesso = total - self.max_bytes
+        for chave, tamanho in self.conn.execute(
+                "SELECT chave, tamanho FROM resumos ORDER BY acessado_em ASC").fetchall():
+            if excesso <= 0:
+                break
+            self.conn.execute("DELETE FROM resumos WHERE chave = ?", (chave,))
+            excesso -= tamanho
+
+    def fechar(self):
+        self.conn.close()
@@ -0,0 +1,186 @@
+# Arquivo: src/ingestion/table_postprocess.py
+import csv
+import hashlib
+import io
+import re
+from typing import Dict, List
+
+import pandas as pd
+
+
+class TablePostProcessor:
+    """
+    Pós-processamento das tabelas do Camelot antes da sumarização/indexação:
+    1. Costura tabelas que continuam na página seguinte (mesmo nº de colunas e
+       cabeçalho repetido, ou continuação direta sem cabeçalho).
+    2. Elimina tabelas idênticas ou quase idênticas (boilerplate recorrente) por
+       impressão digital do conteúdo. "Quase idêntica" exige os mesmos números, na
+       mesma ordem: só rótulos/espaçamento podem variar, nunca um valor.
+    Cada tabela resultante guarda a proveniência de todas as páginas/ids originais
+    (`pagina` = início, `pagina_fim` = fim e, se costurada, `paginas_linhas` com a página
+    de cada linha do CSV), e cada fragmento a menos é um resumo de LLM e um vetor a menos.
+    """
+
+    # Fração mínima de linhas em comum para considerar duas tabelas quase idênticas
+    # (além de todas as células numéricas serem iguais)
+    LIMIAR_QUASE_DUPLICATA = 0.9
+    PADRAO_NUMERO = re.compile(r"\d+(?:[.,]\d+)*")
+
+    @staticmethod
+    def _linhas(dados_tabela: Dict) -> List[List[str]]:
+        conteudo = dados_tabela.get("conteudo_csv") or ""
+        return [l for l in csv.reader(io.StringIO(conteudo)) if any(c.strip() for c in l)]
+
+    @staticmethod
+    def _normalizar_linha(linha: List[str]) -> str:
+        return "|".join(re.sub(r"\s+", " ", c).strip().lower() for c in linha)
+
+    @staticmethod
+    def _pagina(dados_tabela: Dict) -> int:
+        try:
+            return int(dados_tabela.get("pagina"))
+        except (TypeError, ValueError):
+            return -1
+
+    @staticmethod
+    def _parece_dados(linha: List[str]) -> bool:
+        """Linha com alguma célula numérica (fora a 1ª coluna) não é cabeçalho."""
+        return any(re.search(r"\d", c) and not re.search(r"[a-zA-Z]{3,}", c) for c in linha[1:])
+
+    @classmethod
+    def impressao_digital(cls, linhas: List[List[str]]) -> str:
+        """Hash do conteúdo normalizado (espaços/maiúsculas não importam)."""
+        texto = "\n".join(cls._normalizar_linha(l) for l in linhas)
+        return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def numeros(cls, linhas: List[List[str]]) -> tuple:
+        """Sequência de todos os números da tabela, na ordem de leitura."""
+        return tuple(n for linha in linhas for c in linha for n in cls.PADRAO_NUMERO.findall(c))
+
+    @staticmethod
+    def _reconstruir(tabela: Dict, linhas: List[List[str]]):
+        """Regera conteudo_csv/conteudo_html no mesmo formato do TableExtractor."""
+        df = pd.DataFrame(linhas).fillna("")
+        tabela["conteudo_html"] = df.to_html(index=False, header=False)
+        tabela["conteudo_csv"] = df.to_csv(index=False, header=False)
+
+    # --- ETAPA 1: COSTURA ---
+
+    @classmethod
+    def _e_continuacao(cls, anterior: Dict, linhas_ant: List[List[str]], atual: Dict,
+                       linhas_atual: List[List[str]], ultima_da_pagina: bool, primeira_da_pagina: bool) -> str:
+        """
+        Retorna 'cabecalho' (continuação com cabeçalho repetido), 'direta'
+        (continuação sem cabeçalho) ou '' (não é continuação).
+        """
+        if not linhas_ant or not linhas_atual:
+            return ""
+        if cls._pagina(atual) != anterior["paginas"][-1] + 1:
+            return ""
+        if len(linhas_ant[0]) != len(linhas_atual[0]):
+            return ""
+        if cls._normalizar_linha(linhas_atual[0]) == cls._normalizar_linha(linhas_ant[0]):
+            return "cabecalho"
+        if ultima_da_pagina and primeira_da_pagina and cls._parece_dados(linhas_atual[0]):
+            return "direta"
+        return ""
+
+    @classmethod
+    def costurar(cls, tabelas: List[Dict]) -> List[Dict]:
+        """Une fragmentos de uma mesma tabela espalhados por páginas consecutivas."""
+        ordenadas = sorted(enumerate(tabelas), key=lambda par: (cls._pagina(par[1]), par[0]))
+        ordenadas = [t for _, t in ordenadas]
+
+        # Primeira/última tabela de cada página (só elas podem continuar/ser continuadas)
+        primeira, ultima = {}, {}
+        for i, t in enumerate(ordenadas):
+            primeira.setdefault(cls._pagina(t), i)
+            ultima[cls._pagina(t)] = i
+
+        resultado, linhas_resultado, paginas_linhas = [], [], []
+        for i, t in enumerate(ordenadas):
+            linhas = cls._linhas(t)
+            if resultado:
+                anterior, linhas_ant = resultado[-1], linhas_resultado[-1]
+                modo = cls._e_continuacao(
+                    anterior, linhas_ant, t, linhas,
+                    ultima_da_pagina=ultima.get(anterior["paginas"][-1]) == i - 1,
+                    primeira_da_pagina=primeira.get(cls._pagina(t)) == i,
+                )
+                if modo:
+                    novas = linhas[1:] if modo == "cabecalho" else linhas
+                    linhas_ant.extend(novas)
+                    paginas_linhas[-1].extend([cls._pagina(t)] * len(novas))
+                    anterior["paginas"].append(cls._pagina(t))
+                    anterior["origens"].append({"id_tabela": t.get("id_tabela"), "pagina": t.get("pagina"),
+                                                "tipo": "costura"})
+                    continue
+
+            nova = dict(t)
+            nova["paginas"] = [cls._pagina(t)]
+            nova["origens"] = [{"id_tabela": t.get("id_tabela"), "pagina": t.get("pagina"), "tipo": "original"}]
+            resultado.append(nova)
+            linhas_resultado.append(linhas)
+            paginas_linhas.append([cls._pagina(t)] * len(linhas))
+
+        for tabela, linhas, paginas in zip(resultado, linhas_resultado, paginas_linhas):
+            tabela["pagina_fim"] = tabela["paginas"][-1]
+            if len(tabela["paginas"]) > 1:
+                cls._reconstruir(tabela, linhas)
+                tabela["paginas_linhas"] = paginas
+        return resultado
+
+    # --- ETAPA 2: DEDUPLICAÇÃO ---
+
+    @classmethod
+    def deduplicar(cls, tabelas: List[Dict]) -> List[Dict]:
+        """
+        Mantém uma cópia canônica de tabelas idênticas/quase idênticas, somando a proveniência.
+        Tabelas com qualquer número diferente nunca são fundidas (seria perda de dados).
+        """
+        canonicas: List[Dict] = []
+        por_digital: Dict[str, Dict] = {}
+        conjuntos = []  # (nº colunas, números, set de linhas normalizadas) de cada canônica
+
+        for t in tabelas:
+            linhas = cls._linhas(t)
+            digital = cls.impressao_digital(linhas)
+            t["impressao_digital"] = digital
+            numeros = cls.numeros(linhas)
+
+            original = por_digital.get(digital)
+            if original is None and linhas:
+                linhas_norm = {cls._normalizar_linha(l) for l in linhas}
+                for (n_colunas, numeros_canonica, conj), candidata in zip(conjuntos, canonicas):
+                    if n_colunas != len(linhas[0]) or not conj or numeros_canonica != numeros:
+                        continue
+                    jaccard = len(linhas_norm & conj) / len(linhas_norm | conj)
+                    if jaccard >= cls.LIMIAR_QUASE_DUPLICATA:
+                        original = candidata
+                        break
+
+            if original is not None:
+                for origem in t.get("origens", []):
+                    original["origens"].append({**origem, "tipo": "duplicata"})
+                original["paginas"] = sorted(set(original["paginas"]) | set(t.get("paginas", [])))
+                continue
+
+            por_digital[digital] = t
+            canonicas.append(t)
+            conjuntos.append((len(linhas[0]) if linhas else 0, numeros,
+                              {cls._normalizar_linha(l) for l in linhas}))
+
+        return canonicas
+
+    @classmethod
+    def processar(cls, tabelas: List[Dict]) -> List[Dict]:
+        """Pipeline completo: costura -> deduplicação."""
+        total_original = len(tabelas)
+        costuradas = cls.costurar(tabelas)
+        finais = cls.deduplicar(costuradas)
+
+        print(f"   [OK] Pós-processamento de tabelas: {total_original} -> {len(finais)} "
+              f"({total_original - len(costuradas)} fragmentos costurados, "
+              f"{len(costuradas) - len(finais)} duplicatas removidas)")
+        return finais
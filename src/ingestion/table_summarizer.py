@@ -1,19 +1,19 @@
 import json
-import os
 from langchain_core.output_parsers import StrOutputParser
-from src.config import TABLES_DIR, SUMMARIES_DIR
+from src.config import TABLES_DIR, MODEL_NAME
 from src.models.llm_factory import LLMFactory
-from src.prompts.templates import PROMPT_RESUMO
+from src.models.concurrency import PAPEL_LOTE
+from src.prompts.templates import PROMPT_RESUMO, versao_prompt
+from src.ingestion.summary_cache import SummaryCache, conteudo_tabela
 
 
 def gerar_resumos_tabelas():
     """
     Lê os arquivos JSON de tabelas extraídas e gera resumos semânticos usando LLM.
     Essencial para que o RAG consiga encontrar tabelas através de perguntas em linguagem natural.
+    Os resumos ficam no SummaryCache (chave = conteúdo + versão do prompt + modelo),
+    então tabelas inalteradas de outra edição não geram nova chamada ao LLM.
     """
-    # Garante que a pasta de saída existe
-    SUMMARIES_DIR.mkdir(parents=True, exist_ok=True)
-
     arquivos_tabela = list(TABLES_DIR.glob("*.json"))
 
     if not arquivos_tabela:
@@ -23,27 +23,27 @@ def gerar_resumos_tabelas():
     print(f"--- Iniciando sumarização de {len(arquivos_tabela)} tabelas... ---")
 
     # Inicializa o LLM (Vai usar Ollama ou OpenAI dependendo do seu config.py)
-    # Usamos temperature=0 para resumos factuais
-    llm = LLMFactory.create_chat_model(temperature=0)
+    # Usamos temperature=0 para resumos factuais; papel 'lote' cede a vez ao chat
+    llm = LLMFactory.create_chat_model(temperature=0, papel=PAPEL_LOTE)
 
     # Cria a cadeia: Prompt -> LLM -> Texto
     chain = PROMPT_RESUMO | llm | StrOutputParser()
 
+    cache = SummaryCache()
+    versao = versao_prompt("resumo_tabela")
+
     for arquivo in arquivos_tabela:
         try:
             # 1. Ler a tabela bruta
             with open(arquivo, "r", encoding="utf-8") as f:
                 dados = json.load(f)
 
-            # Algumas tabelas podem vir com chaves diferentes dependendo se vieram do camelot ou unstructured
-            # Aqui normalizamos para pegar o conteúdo HTML ou Texto
-            conteudo = dados.get("conteudo_html") or dados.get("conteudo_csv") or dados.get("content") or str(dados)
+            conteudo = conteudo_tabela(dados)
             tabela_id = dados.get("id_tabela") or dados.get("id") or arquivo.stem
+            chave = SummaryCache.chave(conteudo, versao, MODEL_NAME)
 
-            arquivo_saida = SUMMARIES_DIR / f"summary_{tabela_id}.txt"
-
-            # Se o resumo já existe, pula (cache simples)
-            if arquivo_saida.exists():
+            # Se o resumo já existe para este conteúdo, pula (cache por conteúdo)
+            if cache.obter(chave) is not None:
                 print(f"   [Cache] Resumo já existe para: {tabela_id}")
                 continue
 
@@ -54,13 +54,13 @@ def gerar_resumos_tabelas():
             resumo = chain.invoke({"conteudo_tabela": conteudo})
 
             # 3. Salvar o resumo
-            with open(arquivo_saida, "w", encoding="utf-8") as f:
-                f.write(resumo)
+            cache.salvar(chave, resumo, modelo=MODEL_NAME, versao=versao)
 
         except Exception as e:
             print(f"   ❌ Erro ao resumir {arquivo.name}: {e}")
 
-    print("--- Sumarização Concluída ---")
+    print(f"--- Sumarização Concluída ({cache.acertos} do cache, {cache.faltas} novas) ---")
+    cache.fechar()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+# Arquivo: src/models/chains.py
+from typing import List
+
+from langchain_core.documents import Document
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnablePassthrough
+
+
+def formatar_contexto(docs: List[Document]) -> str:
+    """Concatena os documentos recuperados no formato esperado pelos prompts."""
+    return "\n".join([d.page_content for d in docs])
+
+
+def criar_rag_chain(retriever, llm):
+    """
+    Cadeia de Chat (Conversa): Pergunta -> Retriever -> Prompt RAG -> LLM -> Texto.
+    """
+    from src.prompts.templates import PROMPT_RAG_FINAL
+
+    return (
+            {"context": retriever, "question": RunnablePassthrough()}
+            | PROMPT_RAG_FINAL
+            | llm
+            | StrOutputParser()
+    )
+
+
+def criar_resposta_chain(llm):
+    """
+    Cadeia de resposta com contexto já recuperado.
+    Espera {"context": str, "question": str}; útil para streaming e para
+    reaproveitar o mesmo contexto na verificação de alucinação.
+    """
+    from src.prompts.templates import PROMPT_RAG_FINAL
+
+    return PROMPT_RAG_FINAL | llm | StrOutputParser()
+
+
+def criar_extraction_chain(llm):
+    """
+    Cadeia de Extração (Para popular o CSV).
+    Usa o prompt específico 'extracao_relacoes' do YAML e devolve o JSON já decodificado
+    ({"relacoes": [...]}), com a saída restrita ao SCHEMA_RELACOES.
+    A extração roda com prioridade 'lote' no governador de concorrência.
+    """
+    from src.prompts.templates import PROMPT_EXTRACAO
+    from src.models.concurrency import PAPEL_LOTE
+    from src.models.structured_output import GeradorJson, SCHEMA_RELACOES
+
+    if hasattr(llm, "com_papel"):
+        llm = llm.com_papel(PAPEL_LOTE)
+    return PROMPT_EXTRACAO | GeradorJson(llm, SCHEMA_RELACOES)
@@ -0,0 +1,193 @@
+# Arquivo: src/models/concurrency.py
+"""
+Governador global de concorrência para chamadas ao servidor de modelos (Ollama).
+
+Todas as chamadas de LLM e de embedding passam por aqui, com uma classe de prioridade
+por papel: interativo (chat) > verificação (juiz) > lote (resumos, extração, indexação).
+O limite de chamadas simultâneas é adaptativo (AIMD guiado pela latência por unidade
+de saída observada sob disputa) e uma vaga fica reservada ao chat, para que jobs em
+lote não o deixem esperando.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from src.config import GOV_LIMITE_INICIAL, GOV_LIMITE_MIN, GOV_LIMITE_MAX, GOV_TOLERANCIA_LATENCIA
+
+PAPEL_INTERATIVO = "interativo"
+PAPEL_VERIFICACAO = "verificacao"
+PAPEL_LOTE = "lote"
+
+# Menor número = maior prioridade
+PRIORIDADES = {PAPEL_INTERATIVO: 0, PAPEL_VERIFICACAO: 1, PAPEL_LOTE: 2}
+
+# Suavização da média móvel de latência e da linha de base (média lenta, sem disputa)
+_ALFA_EWMA = 0.2
+_ALFA_BASE = 0.05
+
+
+class GovernadorLLM:
+    """
+    Fila de prioridade + limite adaptativo de chamadas simultâneas.
+
+    - Quem espera é atendido por prioridade (e por ordem de chegada dentro dela).
+    - Papéis não interativos só usam `limite - reserva_interativa` vagas (nunca a reservada);
+      o limite nunca cai abaixo de `reserva_interativa + 1`.
+    - A latência é normalizada por unidade de saída (tokens gerados no LLM, textos no
+      embedding), pois a duração bruta varia com o tamanho da resposta.
+    - A linha de base da categoria ('llm' ou 'embedding') é a média lenta das chamadas que
+      rodaram sozinhas. Só chamadas concorrentes podem indicar sobrecarga: se a média
+      recente passar de (base x tolerância), o limite cai (x0.8); senão, com fila
+      esperando, sobe devagar (+1/limite).
+    """
+
+    def __init__(self, limite_inicial: int = GOV_LIMITE_INICIAL, limite_min: int = GOV_LIMITE_MIN,
+                 limite_max: int = GOV_LIMITE_MAX, tolerancia: float = GOV_TOLERANCIA_LATENCIA,
+                 reserva_interativa: int = 1):
+        # Abaixo de reserva + 1 os papéis em lote ficariam sem vaga alguma
+        self.limite_min = max(limite_min, reserva_interativa + 1)
+        self.limite = float(max(limite_inicial, self.limite_min))
+        self.limite_max = limite_max
+        self.tolerancia = tolerancia
+        self.reserva_interativa = reserva_interativa
+
+        self._cond = threading.Condition()
+        self._fila = []  # heap de (prioridade, seq, ticket)
+        self._seq = itertools.count()
+        self.em_execucao = 0
+
+        self._esperando = {papel: 0 for papel in PRIORIDADES}
+        self._concluidas = {papel: 0 for papel in PRIORIDADES}
+        self._espera_total = {papel: 0.0 for papel in PRIORIDADES}
+        self._latencia_ewma: Dict[str, float] = {}
+        self._latencia_base: Dict[str, float] = {}
+
+    # --- ADMISSÃO ---
+
+    def _capacidade(self, prioridade: int) -> int:
+        limite = max(int(self.limite), self.limite_min)
+        if prioridade == PRIORIDADES[PAPEL_INTERATIVO]:
+            return limite
+        return max(0, limite - self.reserva_interativa)
+
+    def adquirir(self, papel: str = PAPEL_LOTE) -> float:
+        """Bloqueia até haver vaga para o papel. Retorna o tempo de espera (s)."""
+        prioridade = PRIORIDADES.get(papel, PRIORIDADES[PAPEL_LOTE])
+        inicio = time.monotonic()
+        with self._cond:
+            ticket = object()
+            heapq.heappush(self._fila, (prioridade, next(self._seq), ticket))
+            self._esperando[papel] += 1
+            while not (self._fila[0][2] is ticket and self.em_execucao < self._capacidade(prioridade)):
+                self._cond.wait()
+            heapq.heappop(self._fila)
+            self._esperando[papel] -= 1
+            self.em_execucao += 1
+            espera = time.monotonic() - inicio
+            self._espera_total[papel] += espera
+            # O próximo da fila pode ter vaga também
+            self._cond.notify_all()
+        return espera
+
+    def liberar(self, papel: str, latencia: Optional[float], categoria: str = "llm",
+                unidades: int = 1, concorrencia: int = 1):
+        """
+        Devolve a vaga. Com latencia=None a chamada não entra nas estatísticas.
+        `unidades` = tamanho da saída (tokens/textos); `concorrencia` = chamadas em
+        execução quando esta começou (incluindo ela).
+        """
+        with self._cond:
+            self.em_execucao -= 1
+            if latencia is not None:
+                self._concluidas[papel] = self._concluidas.get(papel, 0) + 1
+                self._ajustar_limite(latencia / max(unidades, 1), categoria, concorrencia)
+            self._cond.notify_all()
+
+    def _ajustar_limite(self, latencia_unidade: float, categoria: str, concorrencia: int):
+        ewma = self._latencia_ewma.get(categoria)
+        ewma = latencia_unidade if ewma is None else (1 - _ALFA_EWMA) * ewma + _ALFA_EWMA * latencia_unidade
+        self._latencia_ewma[categoria] = ewma
+
+        base = self._latencia_base.get(categoria)
+        if concorrencia <= 1:
+            # Chamada sem disputa: alimenta a linha de base e não pode indicar sobrecarga
+            base = latencia_unidade if base is None else (1 - _ALFA_BASE) * base + _ALFA_BASE * latencia_unidade
+            self._latencia_base[categoria] = base
+            return
+
+        if base is not None and ewma > base * self.tolerancia:
+            self.limite = max(self.limite_min, self.limite * 0.8)
+        elif len(self._fila) > 0:
+            self.limite = min(self.limite_max, self.limite + 1 / self.limite)
+
+    # --- CONTEXTOS ---
+
+    @contextmanager
+    def vaga(self, papel: str = PAPEL_LOTE, categoria: str = "llm"):
+        """
+        Ocupa uma vaga durante o bloco. O valor produzido é um dict de medição:
+        quem chama pode preencher medicao["unidades"] com o tamanho da saída.
+        """
+        self.adquirir(papel)
+        medicao = {"unidades": 1, "concorrencia": self.em_execucao}
+        inicio = time.monotonic()
+        try:
+            yield medicao
+        finally:
+            self.liberar(papel, time.monotonic() - inicio, categoria,
+                         medicao["unidades"], medicao["concorrencia"])
+
+    @asynccontextmanager
+    async def vaga_async(self, papel: str = PAPEL_LOTE, categoria: str = "llm"):
+        # A espera bloqueante roda numa thread para não travar o event loop
+        tarefa = asyncio.ensure_future(asyncio.to_thread(self.adquirir, papel))
+        try:
+            await asyncio.shield(tarefa)
+        except asyncio.CancelledError:
+            # Cliente desistiu: a vaga ainda pode ser concedida à thread; devolve sem medir
+            tarefa.add_done_callback(
+                lambda t: None if t.cancelled() or t.exception() else self.liberar(papel, None, categoria)
+            )
+            raise
+        medicao = {"unidades": 1, "concorrencia": self.em_execucao}
+        inicio = time.monotonic()
+        try:
+            yield medicao
+        finally:
+            self.liberar(papel, time.monotonic() - inicio, categoria,
+                         medicao["unidades"], medicao["concorrencia"])
+
+    # --- MÉTRICAS ---
+
+    def metricas(self) -> Dict:
+        with self._cond:
+            return {
+                "limite": round(self.limite, 2),
+                "em_execucao": self.em_execucao,
+                "fila": dict(self._esperando),
+                "profundidade_fila": len(self._fila),
+                "concluidas": dict(self._concluidas),
+                "espera_media_s": {
+                    p: round(self._espera_total[p] / self._concluidas[p], 4) if self._concluidas[p] else 0.0
+                    for p in PRIORIDADES
+                },
+                "latencia_unidade_ewma_s": {c: round(v, 4) for c, v in self._latencia_ewma.items()},
+                "latencia_unidade_base_s": {c: round(v, 4) for c, v in self._latencia_base.items()},
+            }
+
+
+_governador: Optional[GovernadorLLM] = None
+_governador_lock = threading.Lock()
+
+
+def obter_governador() -> GovernadorLLM:
+    """Governador único do processo (compartilhado por chat, servidor e ingestão)."""
+    global _governador
+    with _governador_lock:
+        if _governador is None:
+            _governador = GovernadorLLM()
+        return _governador
@@ -0,0 +1,139 @@
+# Arquivo: src/models/embedding_batcher.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from src.config import EMBED_LOTE_MAX, EMBED_LOTE_ESPERA_MS
+from src.models.concurrency import PAPEL_INTERATIVO, PAPEL_LOTE, obter_governador
+
+
+class EmbeddingsEmLote(Embeddings):
+    """
+    Agrupa vetorizações de perguntas concorrentes em micro-lotes.
+
+    Cada `embed_query` entra numa fila; uma thread coleta as perguntas que chegam
+    dentro de `espera_ms` (ou até `max_lote`), envia tudo numa única chamada
+    `embed_documents` ao modelo e devolve cada vetor a quem pediu. Perguntas idênticas
+    já em andamento compartilham o mesmo resultado.
+
+    `embed_documents` (indexação) é repassado direto ao modelo base.
+    Ambos passam pelo governador de concorrência: perguntas como 'interativo',
+    indexação como 'lote'.
+    Obs: assume que o provedor vetoriza query e documento da mesma forma
+    (verdade para Ollama/OpenAI; não para modelos com instrução de query).
+    """
+
+    def __init__(self, base: Embeddings, max_lote: int = EMBED_LOTE_MAX,
+                 espera_ms: float = EMBED_LOTE_ESPERA_MS):
+        self.base = base
+        self.max_lote = max_lote
+        self.espera = espera_ms / 1000
+        self._em_andamento: Dict[str, Future] = {}
+        self._fila: List[str] = []
+        self._cond = threading.Condition()
+        self._thread = None
+        # Estatísticas (úteis para calibrar max_lote/espera_ms)
+        self.lotes_enviados = 0
+        self.perguntas_recebidas = 0
+        self.perguntas_deduplicadas = 0
+
+    # --- API Embeddings ---
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with obter_governador().vaga(PAPEL_LOTE, categoria="embedding") as medicao:
+            medicao["unidades"] = len(texts)
+            return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._enfileirar(text).result())
+
+    async def aembed_query(self, text: str) -> List[float]:
+        # O Future é compartilhado por todos que pediram o mesmo texto: cancelar esta chamada
+        # não pode cancelá-lo para os demais (shield sobre a cópia asyncio deste chamador)
+        return list(await asyncio.shield(asyncio.wrap_future(self._enfileirar(text))))
+
+    # --- Micro-lote ---
+
+    def _enfileirar(self, texto: str) -> Future:
+        with self._cond:
+            self.perguntas_recebidas += 1
+            futuro = self._em_andamento.get(texto)
+            if futuro is not None:
+                self.perguntas_deduplicadas += 1
+                return futuro
+
+            futuro = Future()
+            self._em_andamento[texto] = futuro
+            self._fila.append(texto)
+            if self._thread is None or not self._thread.is_alive():
+                self._iniciar_thread()
+            self._cond.notify()
+            return futuro
+
+    def _proximo_lote(self) -> List[str]:
+        with self._cond:
+            while not self._fila:
+                self._cond.wait()
+
+            # Janela de coleta: espera mais perguntas até o prazo ou o lote encher
+            prazo = time.monotonic() + self.espera
+            while len(self._fila) < self.max_lote:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                self._cond.wait(restante)
+
+            lote = self._fila[:self.max_lote]
+            del self._fila[:self.max_lote]
+            return lote
+
+    def _iniciar_thread(self):
+        # Chamado com self._cond adquirido
+        self._thread = threading.Thread(target=self._laco, name="embed-lote", daemon=True)
+        self._thread.start()
+
+    def _laco(self):
+        try:
+            while True:
+                self._processar(self._proximo_lote())
+        finally:
+            # Se a thread morrer, outra assume as perguntas que ainda estão na fila
+            with self._cond:
+                self._thread = None
+                if self._fila:
+                    self._iniciar_thread()
+
+    def _processar(self, lote: List[str]):
+        """Vetoriza o lote e entrega cada vetor; qualquer erro falha todos os futuros do lote."""
+        try:
+            with obter_governador().vaga(PAPEL_INTERATIVO, categoria="embedding") as medicao:
+                medicao["unidades"] = len(lote)
+                vetores = self.base.embed_documents(lote)
+            if len(vetores) != len(lote):
+                raise ValueError(f"Modelo de embedding devolveu {len(vetores)} vetores para {len(lote)} textos.")
+            resultados, erro = list(vetores), None
+        except BaseException as e:
+            resultados, erro = None, e
+        finally:
+            self.lotes_enviados += 1
+            with self._cond:
+                futuros = [self._em_andamento.pop(t, None) for t in lote]
+
+        for i, futuro in enumerate(futuros):
+            # Futuro ausente ou já concluído: nada a entregar
+            if futuro is None or futuro.done():
+                continue
+            try:
+                if erro is not None:
+                    futuro.set_exception(erro)
+                else:
+                    futuro.set_result(resultados[i])
+            except InvalidStateError:
+                pass
+
+        if erro is not None and not isinstance(erro, Exception):
+            raise erro
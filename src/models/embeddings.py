@@ -1,8 +1,4 @@
-from typing import Optional
-from langchain_core.embeddings import Embeddings
-from langchain_ollama import OllamaEmbeddings
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from typing import Optional, TYPE_CHECKING
 
 # Importa configurações do src/config.py
 from src.config import (
@@ -12,6 +8,9 @@ from src.config import (
     EMBEDDING_MODEL_NAME
 )
 
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+
 
 class EmbeddingFactory:
     """
@@ -21,11 +20,14 @@ class EmbeddingFactory:
     2. 'openai': Execução via API (text-embedding-3-small).
     3. 'huggingface': Execução local via CPU/GPU sem servidor (sentence-transformers).
 
+    Os pacotes de cada provedor são importados apenas no ramo correspondente,
+    evitando carregar torch/sentence-transformers ou o SDK da OpenAI sem necessidade.
+
     [cite_start]Referência: Etapa 2 - Processamento e Modelagem[cite: 31].
     """
 
     @staticmethod
-    def get_embedding_model(provider: Optional[str] = None) -> Embeddings:
+    def get_embedding_model(provider: Optional[str] = None) -> "Embeddings":
         """
         Retorna a instância do modelo de embedding configurado.
 
@@ -43,6 +45,8 @@ class EmbeddingFactory:
         if target_provider == "ollama":
             # O modelo ideal para embeddings no Ollama é o 'nomic-embed-text'
             # Llama3 puro não é bom para embeddings, apenas para chat.
+            from langchain_ollama import OllamaEmbeddings
+
             return OllamaEmbeddings(
                 model=EMBEDDING_MODEL_NAME,  # Ex: nomic-embed-text
                 base_url=OLLAMA_BASE_URL  # Ex: http://localhost:11434
@@ -53,6 +57,8 @@ class EmbeddingFactory:
             if not OPENAI_API_KEY:
                 raise ValueError("❌ Erro: API Key da OpenAI não encontrada no .env")
 
+            from langchain_openai import OpenAIEmbeddings
+
             return OpenAIEmbeddings(
                 model=EMBEDDING_MODEL_NAME,  # Ex: text-embedding-3-small
                 api_key=OPENAI_API_KEY
@@ -61,6 +67,8 @@ class EmbeddingFactory:
         # --- OPÇÃO 3: HUGGINGFACE (Local Libraries) ---
         elif target_provider == "huggingface":
             print("   Carregando modelo Sentence-Transformers (pode demorar na 1ª vez)...")
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+
             # Modelo multilíngue excelente e leve
             model_name = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
             return HuggingFaceEmbeddings(model_name=model_name)
@@ -1,5 +1,81 @@
-from langchain_ollama import ChatOllama
+from typing import Optional
+
+from langchain_core.runnables import Runnable
+
 from src.config import MODEL_NAME, OLLAMA_BASE_URL
+from src.models.concurrency import PAPEL_INTERATIVO, GovernadorLLM, obter_governador
+
+
+class ModeloGovernado(Runnable):
+    """
+    Envolve um chat model para que toda chamada (invoke/stream, sync e async)
+    passe pelo governador de concorrência com a prioridade do seu papel.
+    Funciona como qualquer Runnable dentro de cadeias (prompt | llm | parser).
+    """
+
+    def __init__(self, modelo, papel: str = PAPEL_INTERATIVO, governador: Optional[GovernadorLLM] = None):
+        self.modelo = modelo
+        self.papel = papel
+        self.governador = governador or obter_governador()
+
+    def com_papel(self, papel: str) -> "ModeloGovernado":
+        """Mesmo modelo (mesmo cliente), outra prioridade."""
+        return ModeloGovernado(self.modelo, papel, self.governador)
+
+    def com_formato(self, formato) -> "ModeloGovernado":
+        """
+        Mesmo modelo restrito a um formato de saída ('json' ou um JSON schema, ver
+        src/models/structured_output.py). Provedores sem o parâmetro `format` ficam como estão.
+        """
+        if "format" not in getattr(type(self.modelo), "model_fields", {}):
+            return self
+        return ModeloGovernado(self.modelo.model_copy(update={"format": formato}), self.papel, self.governador)
+
+    @staticmethod
+    def _tokens_saida(mensagem, pedacos: int = 0) -> int:
+        """Tokens gerados (usage_metadata do provedor; senão, pedaços do stream ou ~4 caracteres/token)."""
+        uso = getattr(mensagem, "usage_metadata", None) or {}
+        if uso.get("output_tokens"):
+            return uso["output_tokens"]
+        if pedacos:
+            return pedacos
+        conteudo = getattr(mensagem, "content", "")
+        return max(1, len(conteudo) // 4) if isinstance(conteudo, str) else 1
+
+    def invoke(self, input, config=None, **kwargs):
+        with self.governador.vaga(self.papel) as medicao:
+            resultado = self.modelo.invoke(input, config, **kwargs)
+            medicao["unidades"] = self._tokens_saida(resultado)
+            return resultado
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        async with self.governador.vaga_async(self.papel) as medicao:
+            resultado = await self.modelo.ainvoke(input, config, **kwargs)
+            medicao["unidades"] = self._tokens_saida(resultado)
+            return resultado
+
+    def stream(self, input, config=None, **kwargs):
+        with self.governador.vaga(self.papel) as medicao:
+            pedacos = 0
+            for pedaco in self.modelo.stream(input, config, **kwargs):
+                pedacos += 1
+                medicao["unidades"] = self._tokens_saida(pedaco, pedacos)
+                yield pedaco
+
+    async def astream(self, input, config=None, **kwargs):
+        async with self.governador.vaga_async(self.papel) as medicao:
+            pedacos = 0
+            async for pedaco in self.modelo.astream(input, config, **kwargs):
+                pedacos += 1
+                medicao["unidades"] = self._tokens_saida(pedaco, pedacos)
+                yield pedaco
+
+    def __getattr__(self, nome):
+        # Atributos do modelo (ex: model, temperature) continuam acessíveis
+        if nome == "modelo":
+            raise AttributeError(nome)
+        return getattr(self.modelo, nome)
+
 
 class LLMFactory:
     """
@@ -7,14 +83,20 @@ class LLMFactory:
     """
 
     @staticmethod
-    def create_chat_model(temperature: float = 0):
+    def create_chat_model(temperature: float = 0, papel: str = PAPEL_INTERATIVO):
         """
         Cria uma instância do Llama 3 rodando localmente.
+        As chamadas passam pelo governador global com a prioridade de `papel`
+        ('interativo', 'verificacao' ou 'lote', ver src/models/concurrency.py).
         """
-        return ChatOllama(
+        # Import tardio: langchain_ollama só é carregado quando um modelo é criado
+        from langchain_ollama import ChatOllama
+
+        modelo = ChatOllama(
             model=MODEL_NAME,
             temperature=temperature,
             base_url=OLLAMA_BASE_URL,
             # num_predict=-1, # Opcional: define tokens máximos
             # keep_alive="1h" # Opcional: mantém o modelo na RAM para ser rápido
-        )
\ No newline at end of file
+        )
+        return ModeloGovernado(modelo, papel)
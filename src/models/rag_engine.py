@@ -1,133 +1,427 @@
 import uuid
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import List, Any
+from typing import List, Any, Dict, Optional, Tuple, Union
 
 # --- IMPORTS DO LANGCHAIN CORE (Esses funcionam sempre) ---
-from langchain_chroma import Chroma
+# Obs: langchain_chroma (chromadb) é importado dentro de RAGEngine.__init__ (e numpy, no snapshot)
 from langchain_core.stores import InMemoryByteStore
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
-from langchain_core.vectorstores import VectorStore
 from langchain_core.stores import BaseStore
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from pydantic import Field
 
 # Imports Locais
-from src.config import PROCESSED_DIR, DATA_DIR, EMBEDDING_PROVIDER
+from src.config import (PROCESSED_DIR, DATA_DIR, EMBEDDING_PROVIDER, EMBEDDING_MODEL_NAME, SHARD_MAX_WORKERS,
+                        DEDUP_DB, FACTS_DB)
 from src.models.embeddings import EmbeddingFactory
+from src.models.embedding_batcher import EmbeddingsEmLote
 
 
-# --- CLASSE MANUAL PARA SUBSTITUIR O IMPORT QUEBRADO ---
-class LocalMultiVectorRetriever(BaseRetriever):
+# --- RETRIEVER (implementação local do MultiVectorRetriever, particionada por edição) ---
+class ShardedMultiVectorRetriever(BaseRetriever):
     """
-    Implementação local do MultiVectorRetriever para evitar erros de importação.
-    Recupera vetores (resumos) e mapeia para documentos originais (tabelas/textos).
+    MultiVectorRetriever para índices particionados (um shard por edição): recupera vetores
+    (resumos) e mapeia para os documentos originais (tabelas/textos) no ByteStore.
+    A pergunta é vetorizada uma única vez; a busca é disparada em paralelo nos shards
+    selecionados pelo roteador (RAGEngine) e os resultados são mesclados por distância.
     """
-    vectorstore: VectorStore
+    roteador: Any
     byte_store: BaseStore
     id_key: str = "doc_id"
-    search_type: str = "similarity"
     search_kwargs: dict = Field(default_factory=dict)
+    edicoes: Optional[List[str]] = None
+    fontes: Optional[List[str]] = None
 
     def _get_relevant_documents(
             self, query: str, *, run_manager: CallbackManagerForRetrieverRun = None
     ) -> List[Document]:
-        # 1. Busca os vetores (Resumos)
-        sub_docs = self.vectorstore.search(query, self.search_type, **self.search_kwargs)
+        k = self.search_kwargs.get("k", 4)
+        where = self.search_kwargs.get("filter")
 
-        # 2. Extrai os IDs dos documentos pais
+        # 1. Busca os vetores (Resumos) em todos os shards selecionados
+        resultados = self.roteador.buscar_em_shards(
+            query, k=k, filtro=where, edicoes=self.edicoes, fontes=self.fontes
+        )
+
+        # 2. Extrai os IDs dos documentos pais (sem repetição, na ordem de relevância)
         ids = []
-        for d in sub_docs:
-            if self.id_key in d.metadata:
-                ids.append(d.metadata[self.id_key])
+        for d, _ in resultados:
+            doc_id = d.metadata.get(self.id_key)
+            if doc_id is not None and doc_id not in ids:
+                ids.append(doc_id)
 
-        # 3. Busca os documentos originais no ByteStore usando os IDs
-        # O mget retorna uma lista de valores (ou None se não achar)
+        # 3. Busca os documentos originais no ByteStore e filtra Nones
         docs = self.byte_store.mget(ids)
-
-        # 4. Filtra Nones e retorna documentos reais
         return [d for d in docs if d is not None]
 
 
+# --- METADADOS E FILTROS ---
+MODALIDADE_TEXTO = "texto"
+MODALIDADE_TABELA = "tabela"
+
+
+def _pagina_int(valor) -> Optional[int]:
+    """Camelot devolve a página como string; o filtro por intervalo exige inteiro."""
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _edicao_json(data: Dict[str, Any]) -> Optional[str]:
+    """Edição de um JSON processado (texto ou tabela): campo 'edicao' ou nome do PDF de origem."""
+    origem = data.get("source") or data.get("origem")
+    return data.get("edicao") or (Path(origem).stem if origem else None)
+
+
+def montar_metadados(**campos) -> Dict[str, Any]:
+    """Remove campos vazios (o Chroma não aceita None como valor de metadado)."""
+    return {k: v for k, v in campos.items() if v is not None and v != ""}
+
+
+def construir_filtro(
+        fonte: Union[str, List[str], None] = None,
+        edicao: Union[str, List[str], None] = None,
+        modalidade: Union[str, List[str], None] = None,
+        id_tabela: Union[str, List[str], None] = None,
+        pagina_min: Optional[int] = None,
+        pagina_max: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Monta a cláusula `where` do Chroma a partir dos filtros informados.
+    Listas viram `$in`; páginas viram `$gte`/`$lte`. Retorna None se não houver filtro.
+    Um documento que ocupa várias páginas (tabela costurada: `pagina` até `pagina_fim`)
+    entra se qualquer uma delas cair no intervalo.
+
+    Ex: construir_filtro(edicao="REF_2023_2S", modalidade="tabela", pagina_min=10, pagina_max=20)
+    """
+    condicoes = []
+    for campo, valor in (("fonte", fonte), ("edicao", edicao), ("modalidade", modalidade), ("id_tabela", id_tabela)):
+        if valor is None:
+            continue
+        if isinstance(valor, (list, tuple, set)):
+            condicoes.append({campo: {"$in": list(valor)}})
+        else:
+            condicoes.append({campo: {"$eq": valor}})
+
+    if pagina_min is not None:
+        # Índices antigos não têm `pagina_fim`: `pagina` continua valendo para eles
+        condicoes.append({"$or": [{"pagina_fim": {"$gte": int(pagina_min)}},
+                                  {"pagina": {"$gte": int(pagina_min)}}]})
+    if pagina_max is not None:
+        condicoes.append({"pagina": {"$lte": int(pagina_max)}})
+
+    if not condicoes:
+        return None
+    if len(condicoes) == 1:
+        return condicoes[0]
+    return {"$and": condicoes}
+
+
 # --- MOTOR RAG ---
+def _como_lista(valor) -> Optional[List[str]]:
+    if valor is None:
+        return None
+    if isinstance(valor, (list, tuple, set)):
+        return list(valor)
+    return [valor]
+
+
+def nome_colecao_shard(edicao: str) -> str:
+    """Converte a edição num nome de coleção válido para o Chroma."""
+    slug = re.sub(r"[^a-zA-Z0-9_-]+", "_", str(edicao)).strip("_-")
+    return f"ecladatta_{slug or 'sem_edicao'}"[:63]
+
+
 class RAGEngine:
     """
     Motor de Recuperação Aumentada (RAG) Híbrido.
+    Cada vetor carrega metadados (fonte, edicao, pagina, modalidade, id_tabela),
+    permitindo buscas restritas a uma edição, intervalo de páginas ou só tabelas.
+
+    O índice é particionado: uma coleção do Chroma por edição (shard), registrada no
+    manifesto `shards.json`. Shards podem ser adicionados, removidos ou re-indexados
+    isoladamente, e as consultas só tocam os shards relevantes.
+
+    O índice inteiro pode ser exportado como snapshot (exportar_snapshot) e aberto
+    em outra máquina com RAGEngine(snapshot=...), somente leitura.
     """
 
-    def __init__(self, persist_dir: str = None):
-        # 1. Configura Embeddings
-        self.embedding_model = EmbeddingFactory.get_embedding_model(provider=EMBEDDING_PROVIDER)
+    MANIFESTO = "shards.json"
+
+    def __init__(self, persist_dir: str = None, snapshot: Union[str, Path, None] = None):
+        """
+        Args:
+            persist_dir: Diretório do Chroma (padrão: data/vector_db).
+            snapshot: Caminho de um snapshot exportado (ver src/models/snapshot.py).
+                Se informado, o motor sobe somente leitura a partir dele, sem Chroma.
+        """
+        # 1. Configura Embeddings (perguntas concorrentes são vetorizadas em micro-lotes)
+        self.embedding_model = EmbeddingsEmLote(EmbeddingFactory.get_embedding_model(provider=EMBEDDING_PROVIDER))
 
         if persist_dir is None:
             persist_dir = str(DATA_DIR / "vector_db")
+        self.persist_dir = Path(persist_dir)
+        self._shards: Dict[str, Any] = {}
+        self._executor = ThreadPoolExecutor(max_workers=SHARD_MAX_WORKERS, thread_name_prefix="shard")
 
-        # 2. Inicializa o Vector Store (ChromaDB)
-        self.vectorstore = Chroma(
-            collection_name="ecladatta_docs",
-            embedding_function=self.embedding_model,
-            persist_directory=persist_dir
-        )
-
-        # 3. Inicializa o DocStore (Memória)
+        # 2. Inicializa o DocStore (Memória)
         self.store = InMemoryByteStore()
         self.id_key = "doc_id"
 
-        # 4. Configura o Retriever (Usando nossa classe local)
-        self.retriever = LocalMultiVectorRetriever(
-            vectorstore=self.vectorstore,
+        # 3. Fonte dos vetores: snapshot (mmap, somente leitura) ou cliente do ChromaDB
+        #    (um único cliente para todos os shards)
+        self.snapshot = None
+        self.client = None
+        if snapshot is not None:
+            self._abrir_snapshot(snapshot)
+        else:
+            import chromadb
+
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            self.client = chromadb.PersistentClient(path=str(self.persist_dir))
+            self.manifesto = self._ler_manifesto()
+            self._carregar_pais()
+
+        # 4. Configura o Retriever (sobre todos os shards)
+        self.retriever = ShardedMultiVectorRetriever(
+            roteador=self,
             byte_store=self.store,
             id_key=self.id_key,
         )
 
-    def indexar_dados(self):
+    @property
+    def somente_leitura(self) -> bool:
+        return self.snapshot is not None
+
+    def _exigir_escrita(self):
+        if self.somente_leitura:
+            raise RuntimeError("Motor carregado de snapshot é somente leitura.")
+
+    # --- MANIFESTO DE SHARDS ---
+
+    def _caminho_manifesto(self) -> Path:
+        return self.persist_dir / self.MANIFESTO
+
+    def _ler_manifesto(self) -> Dict:
+        caminho = self._caminho_manifesto()
+        if caminho.exists():
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {"versao": 1, "shards": {}}
+
+    def _salvar_manifesto(self):
+        caminho = self._caminho_manifesto()
+        temporario = caminho.with_suffix(".tmp")
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.manifesto, f, ensure_ascii=False, indent=4)
+        temporario.replace(caminho)
+
+    def listar_shards(self) -> Dict[str, Dict]:
+        """Retorna {edicao: {colecao, fontes, n_vetores, atualizado_em}}."""
+        return dict(self.manifesto["shards"])
+
+    def _vectorstore_shard(self, edicao: str):
+        if edicao not in self._shards and self.somente_leitura:
+            self._shards[edicao] = self.snapshot.vectorstore(edicao, self.embedding_model)
+        elif edicao not in self._shards:
+            from langchain_chroma import Chroma
+
+            info = self.manifesto["shards"].get(edicao) or {}
+            self._shards[edicao] = Chroma(
+                client=self.client,
+                collection_name=info.get("colecao") or nome_colecao_shard(edicao),
+                embedding_function=self.embedding_model,
+            )
+        return self._shards[edicao]
+
+    def selecionar_shards(self, edicoes: Optional[List[str]] = None,
+                          fontes: Optional[List[str]] = None) -> List[str]:
+        """Roteamento: escolhe os shards pelas edições e/ou fontes pedidas (todos, se nenhuma)."""
+        selecionados = []
+        for edicao, info in self.manifesto["shards"].items():
+            if edicoes is not None and edicao not in edicoes:
+                continue
+            if fontes is not None and not set(fontes) & set(info.get("fontes", [])):
+                continue
+            selecionados.append(edicao)
+        return selecionados
+
+    def remover_shard(self, edicao: str):
         """
-        Lê JSONs e popula o banco de dados.
+        Remove a edição: coleção, documentos pais, entrada no manifesto, fatos numéricos,
+        índice de deduplicação e JSONs processados (senão um `indexar_dados()` sem
+        argumentos recriaria o shard). Re-indexar usa só `_descartar_colecao`.
         """
-        print("--- Iniciando Indexação Híbrida ---")
-
-        # A. Indexar Textos
+        self._exigir_escrita()
+        if edicao not in self.manifesto["shards"]:
+            print(f"⚠️ Shard '{edicao}' não encontrado.")
+            return
+
+        self._descartar_colecao(edicao)
+        self._salvar_manifesto()
+        self._remover_fatos(edicao)
+        self._remover_dedup(edicao)
+        removidos = self._remover_processados(edicao)
+        print(f"   [OK] Shard '{edicao}' removido ({removidos} arquivos processados apagados).")
+
+    def _descartar_colecao(self, edicao: str):
+        """Apaga a coleção do Chroma e os documentos pais do shard (o manifesto não é gravado)."""
+        info = self.manifesto["shards"][edicao]
+        vectorstore = self._vectorstore_shard(edicao)
+        metadados = vectorstore.get(include=["metadatas"]).get("metadatas") or []
+        ids_pais = [m[self.id_key] for m in metadados if m and self.id_key in m]
+        if ids_pais:
+            self.store.mdelete(ids_pais)
+
+        self.client.delete_collection(info["colecao"])
+        self._caminho_pais(info["colecao"]).unlink(missing_ok=True)
+        self._shards.pop(edicao, None)
+        del self.manifesto["shards"][edicao]
+
+    @staticmethod
+    def _remover_fatos(edicao: str):
+        """Tira a edição do FactStore (senão o atalho factual continuaria respondendo por ela)."""
+        if not FACTS_DB.exists():
+            return
+        from src.ingestion.fact_store import FactStore
+        fatos = FactStore(FACTS_DB)
+        try:
+            fatos.remover_edicao(edicao)
+        finally:
+            fatos.fechar()
+
+    @staticmethod
+    def _remover_processados(edicao: str) -> int:
+        """Apaga os JSONs de texto e de tabela da edição. Retorna quantos arquivos foram apagados."""
+        removidos = 0
+        for pasta in (PROCESSED_DIR / "texts", PROCESSED_DIR / "tables"):
+            if not pasta.exists():
+                continue
+            for f in pasta.glob("*.json"):
+                try:
+                    with open(f, 'r', encoding='utf-8') as file:
+                        data = json.load(file)
+                except Exception:
+                    continue
+                if _edicao_json(data) == edicao:
+                    f.unlink(missing_ok=True)
+                    removidos += 1
+        return removidos
+
+    @staticmethod
+    def _remover_dedup(edicao: str):
+        """Tira a edição do índice de deduplicação (canônicos e procedência)."""
+        if not DEDUP_DB.exists():
+            return
+        from src.ingestion.dedup import DeduplicadorMinHash
+        dedup = DeduplicadorMinHash(DEDUP_DB)
+        try:
+            dedup.remover_edicao(edicao)
+        finally:
+            dedup.fechar()
+
+    def reindexar_shard(self, edicao: str):
+        """Re-indexa apenas uma edição a partir dos JSONs processados."""
+        self.indexar_dados(edicoes=[edicao])
+
+    # --- DOCUMENTOS PAIS (persistidos por shard, ao lado do Chroma) ---
+
+    def _caminho_pais(self, colecao: str) -> Path:
+        return self.persist_dir / f"pais_{colecao}.json"
+
+    def _salvar_pais(self, colecao: str, itens: list):
+        """Grava os documentos originais do shard para que outro processo não precise re-ingerir."""
+        caminho = self._caminho_pais(colecao)
+        temporario = caminho.with_suffix(".tmp")
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({i: {"page_content": o.page_content, "metadata": o.metadata} for i, _, o in itens},
+                      f, ensure_ascii=False)
+        temporario.replace(caminho)
+
+    def _carregar_pais(self):
+        for edicao, info in self.manifesto["shards"].items():
+            caminho = self._caminho_pais(info["colecao"])
+            if not caminho.exists():
+                print(f"⚠️ Documentos pais do shard '{edicao}' ausentes; re-indexe a edição.")
+                continue
+            with open(caminho, 'r', encoding='utf-8') as f:
+                pais = json.load(f)
+            self.store.mset([(i, Document(page_content=d["page_content"], metadata=d["metadata"]))
+                             for i, d in pais.items()])
+
+    # --- SNAPSHOT (exportação/importação do índice empacotado) ---
+
+    def _abrir_snapshot(self, caminho: Union[str, Path]):
+        from src.models.snapshot import Snapshot
+
+        snapshot = Snapshot(caminho)
+        # Vetores de outro modelo (ou de outra dimensão) não são comparáveis com as perguntas
+        embedding = snapshot.manifesto["embedding"]
+        if (embedding.get("provedor"), embedding.get("modelo")) != (EMBEDDING_PROVIDER, EMBEDDING_MODEL_NAME):
+            raise ValueError(
+                f"Snapshot gerado com {embedding.get('provedor')}/'{embedding.get('modelo')}' "
+                f"(dimensão {embedding.get('dimensao')}), mas o configurado é "
+                f"{EMBEDDING_PROVIDER}/'{EMBEDDING_MODEL_NAME}'.")
+        self.snapshot = snapshot
+        self.manifesto = {"versao": 1, "shards": snapshot.shards}
+        # Documentos pais lidos sob demanda do mmap (nada é copiado para a memória)
+        self.store = snapshot.loja_pais()
+
+    def exportar_snapshot(self, destino: Union[str, Path]) -> Dict:
+        """Empacota todos os shards (vetores, metadados e documentos pais) em `destino`."""
+        from src.models.snapshot import exportar_snapshot
+
+        self._exigir_escrita()
+        return exportar_snapshot(self, destino)
+
+    # --- INDEXAÇÃO ---
+
+    def _carregar_textos(self) -> List[Tuple[str, Document, Document]]:
+        """Lê os JSONs de texto. Retorna (id, doc_para_vetor, doc_original)."""
         path_textos = PROCESSED_DIR / "texts"
-        textos_objs = []
-        ids_textos = []
+        itens = []
 
         if path_textos.exists():
-            arquivos_texto = list(path_textos.glob("*.json"))
-            for f in arquivos_texto:
+            for f in path_textos.glob("*.json"):
                 try:
                     with open(f, 'r', encoding='utf-8') as file:
                         data = json.load(file)
-                        conteudo = data.get('content') or ""
-                        origem = data.get("source") or f.name
+                        # pdf_loader grava 'conteudo'/'origem'; 'content'/'source' mantidos por compatibilidade
+                        conteudo = data.get('content') or data.get('conteudo') or ""
+                        origem = data.get("source") or data.get("origem") or f.name
 
                         if conteudo.strip():
-                            doc = Document(page_content=conteudo, metadata={"source": origem})
-                            textos_objs.append(doc)
-                            ids_textos.append(str(uuid.uuid4()))
+                            metadados = montar_metadados(
+                                source=origem,
+                                fonte=origem,
+                                edicao=data.get("edicao") or Path(origem).stem,
+                                pagina=_pagina_int(data.get("pagina")),
+                                modalidade=MODALIDADE_TEXTO,
+                            )
+                            doc_id = str(uuid.uuid4())
+                            doc = Document(page_content=conteudo, metadata=metadados)
+                            doc_vetor = Document(page_content=conteudo, metadata={**metadados, self.id_key: doc_id})
+                            itens.append((doc_id, doc_vetor, doc))
                 except Exception:
                     pass
+        return itens
 
-            if textos_objs:
-                docs_para_vetor = [
-                    Document(page_content=t.page_content, metadata={self.id_key: ids_textos[i]})
-                    for i, t in enumerate(textos_objs)
-                ]
-                self.vectorstore.add_documents(docs_para_vetor)
-                self.store.mset(list(zip(ids_textos, textos_objs)))
-                print(f"   [OK] {len(textos_objs)} blocos de texto indexados.")
+    def _carregar_tabelas(self) -> List[Tuple[str, Document, Document]]:
+        """Lê os JSONs de tabela + resumos (via SummaryCache). Retorna (id, doc_resumo, doc_tabela)."""
+        from src.ingestion.summary_cache import SummaryCache
 
-        # B. Indexar Tabelas
         path_tabelas = PROCESSED_DIR / "tables"
-        path_resumos = PROCESSED_DIR / "summaries"
-
-        resumos_objs = []
-        tabelas_reais = []
-        ids_tabelas = []
+        cache = SummaryCache()
+        itens = []
 
         if path_tabelas.exists():
-            arquivos_tabela = list(path_tabelas.glob("*.json"))
-            for f_tab in arquivos_tabela:
+            for f_tab in path_tabelas.glob("*.json"):
                 try:
                     with open(f_tab, 'r', encoding='utf-8') as file:
                         data_tab = json.load(file)
@@ -135,32 +429,149 @@ class RAGEngine:
                     tabela_id = data_tab.get('id') or data_tab.get('id_tabela')
                     if not tabela_id: continue
 
-                    f_resumo = path_resumos / f"summary_{tabela_id}.txt"
-
-                    if f_resumo.exists():
-                        with open(f_resumo, 'r', encoding='utf-8') as fr:
-                            texto_resumo = fr.read()
+                    texto_resumo = cache.obter(SummaryCache.chave_tabela(data_tab))
+
+                    if texto_resumo is not None:
+                        origem = data_tab.get("source") or data_tab.get("origem") or "desc"
+                        metadados = montar_metadados(
+                            fonte=origem,
+                            edicao=data_tab.get("edicao") or Path(origem).stem,
+                            pagina=_pagina_int(data_tab.get("pagina")),
+                            pagina_fim=_pagina_int(data_tab.get("pagina_fim") or data_tab.get("pagina")),
+                            modalidade=MODALIDADE_TABELA,
+                            id_tabela=tabela_id,
+                        )
 
-                        doc_resumo = Document(page_content=texto_resumo, metadata={self.id_key: tabela_id})
+                        doc_resumo = Document(page_content=texto_resumo, metadata={**metadados, self.id_key: tabela_id})
 
                         conteudo_raw = data_tab.get('content') or data_tab.get('conteudo_html') or str(data_tab)
                         conteudo_real = f"DADOS TABULARES DO DOCUMENTO:\n{conteudo_raw}"
 
                         doc_tabela = Document(
                             page_content=conteudo_real,
-                            metadata={"type": "tabela", "source": data_tab.get("source", "desc")}
+                            metadata={**metadados, "type": "tabela", "source": origem}
                         )
 
-                        resumos_objs.append(doc_resumo)
-                        tabelas_reais.append(doc_tabela)
-                        ids_tabelas.append(tabela_id)
+                        itens.append((tabela_id, doc_resumo, doc_tabela))
                 except Exception:
                     pass
+        cache.fechar()
+        return itens
+
+    def indexar_dados(self, edicoes: Optional[List[str]] = None):
+        """
+        Lê JSONs e popula o banco de dados, um shard por edição.
+        Cada shard indexado é recriado do zero; os demais não são tocados.
+
+        Args:
+            edicoes: Restringe a (re)indexação a estas edições. Padrão: todas as encontradas.
+        """
+        self._exigir_escrita()
+        print("--- Iniciando Indexação Híbrida ---")
+
+        # Agrupa textos (A) e tabelas (B) por edição
+        por_edicao: Dict[str, Dict[str, list]] = {}
+        for modalidade, itens in (("textos", self._carregar_textos()), ("tabelas", self._carregar_tabelas())):
+            for item in itens:
+                edicao = item[1].metadata.get("edicao", "sem_edicao")
+                por_edicao.setdefault(edicao, {"textos": [], "tabelas": []})[modalidade].append(item)
+
+        for edicao, grupos in por_edicao.items():
+            if edicoes is not None and edicao not in edicoes:
+                continue
+            self._indexar_shard(edicao, grupos["textos"], grupos["tabelas"])
+
+    def _indexar_shard(self, edicao: str, textos: list, tabelas: list):
+        colecao = nome_colecao_shard(edicao)
+        if edicao in self.manifesto["shards"]:
+            # Substitui só os vetores: o índice de deduplicação acabou de ser refeito na ingestão
+            self._descartar_colecao(edicao)
+        else:
+            # Coleção órfã (ex: indexação interrompida antes de gravar o manifesto)
+            try:
+                self.client.delete_collection(colecao)
+            except Exception:
+                pass
+
+        self.manifesto["shards"][edicao] = {"colecao": colecao}
+        vectorstore = self._vectorstore_shard(edicao)
+
+        self._salvar_pais(colecao, textos + tabelas)
+
+        fontes = set()
+        for rotulo, itens in (("blocos de texto indexados", textos), ("tabelas indexadas", tabelas)):
+            if not itens:
+                continue
+            ids = [i for i, _, _ in itens]
+            vectorstore.add_documents([v for _, v, _ in itens])
+            self.store.mset(list(zip(ids, [o for _, _, o in itens])))
+            fontes.update(v.metadata.get("fonte") for _, v, _ in itens if v.metadata.get("fonte"))
+            print(f"   [OK] [{edicao}] {len(itens)} {rotulo}.")
+
+        self.manifesto["shards"][edicao] = {
+            "colecao": colecao,
+            "fontes": sorted(fontes),
+            "n_vetores": len(textos) + len(tabelas),
+            "atualizado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._salvar_manifesto()
+
+    # --- CONSULTA ---
+
+    def buscar_em_shards(self, pergunta: str, k: int = 4, filtro: Optional[Dict] = None,
+                         edicoes: Optional[List[str]] = None,
+                         fontes: Optional[List[str]] = None) -> List[Tuple[Document, float]]:
+        """
+        Fan-out: vetoriza a pergunta uma vez, busca em paralelo nos shards selecionados
+        (com o filtro `where` aplicado dentro de cada coleção) e devolve os k melhores
+        (documento, distância) mesclados — menor distância primeiro.
+        """
+        shards = self.selecionar_shards(edicoes, fontes)
+        if not shards:
+            return []
+
+        vetor = self.embedding_model.embed_query(pergunta)
+
+        def _buscar(edicao):
+            return self._vectorstore_shard(edicao).similarity_search_by_vector_with_relevance_scores(
+                vetor, k=k, filter=filtro
+            )
+
+        if len(shards) == 1:
+            parciais = [_buscar(shards[0])]
+        else:
+            parciais = list(self._executor.map(_buscar, shards))
 
-            if resumos_objs:
-                self.vectorstore.add_documents(resumos_objs)
-                self.store.mset(list(zip(ids_tabelas, tabelas_reais)))
-                print(f"   [OK] {len(resumos_objs)} tabelas indexadas.")
+        mesclados = [par for parcial in parciais for par in parcial]
+        mesclados.sort(key=lambda par: par[1])
+        return mesclados[:k]
+
+    def get_retriever(self, k: Optional[int] = None, **filtros):
+        """
+        Retorna o retriever padrão ou, se houver filtros/k, um retriever restrito.
+        Filtros aceitos: fonte, edicao, modalidade, id_tabela, pagina_min, pagina_max
+        (ver construir_filtro). Ex: get_retriever(edicao="REF_2023_2S", modalidade="tabela").
+        Filtros de edição/fonte também restringem quais shards são consultados.
+        """
+        where = construir_filtro(**filtros)
+        if where is None and k is None:
+            return self.retriever
+
+        search_kwargs = dict(self.retriever.search_kwargs)
+        if where is not None:
+            search_kwargs["filter"] = where
+        if k is not None:
+            search_kwargs["k"] = k
+
+        return ShardedMultiVectorRetriever(
+            roteador=self,
+            byte_store=self.store,
+            id_key=self.id_key,
+            search_kwargs=search_kwargs,
+            edicoes=_como_lista(filtros.get("edicao")),
+            fontes=_como_lista(filtros.get("fonte")),
+        )
 
-    def get_retriever(self):
-        return self.retriever
\ No newline at end of file
+    def buscar(self, pergunta: str, k: Optional[int] = None, **filtros) -> List[Document]:
+        """Atalho: recupera os documentos originais para `pergunta` com filtros pushdown."""
+        return self.get_retriever(k=k, **filtros).invoke(pergunta)
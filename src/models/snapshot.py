@@ -0,0 +1,351 @@
+# Arquivo: src/models/snapshot.py
+"""
+Snapshot empacotado do índice: vetores, documentos pais, metadados e manifesto num
+único arquivo versionado e com checksums, para levar o chat a outra máquina.
+
+Layout do arquivo (inteiros little-endian):
+    [MAGICO (8 bytes)][tamanho do manifesto (uint64)][manifesto JSON][padding]
+    [seção 'vetores': matriz float32 (n_vetores x dimensao), alinhada]
+    [seção 'registros': JSON com ids, textos vetorizados e metadados de cada linha]
+    [seção 'indice_pais': JSON {doc_id: [offset, tamanho]} dentro da seção 'pais']
+    [seção 'pais': documentos originais, um objeto JSON por doc_id, concatenados]
+
+Os offsets do manifesto são relativos ao início das seções. A matriz é lida por
+memory-mapping (numpy.frombuffer sobre mmap), sem copiar nem re-inserir vetores, e
+cada documento pai só é decodificado quando o retriever o pede: um nó de chat somente
+leitura sobe sem nenhuma chamada ao LLM ou ao embedding.
+"""
+import hashlib
+import json
+import mmap
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.stores import BaseStore
+from langchain_core.vectorstores import VectorStore
+
+from src.config import EMBEDDING_PROVIDER, EMBEDDING_MODEL_NAME, garantir_diretorios
+
+MAGICO = b"ECLSNAP\x00"
+VERSAO_FORMATO = 2
+_CABECALHO = struct.Struct("<8sQ")
+_ALINHAMENTO = 64
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + _ALINHAMENTO - 1) // _ALINHAMENTO * _ALINHAMENTO
+
+
+def _sha256(dados) -> str:
+    return hashlib.sha256(dados).hexdigest()
+
+
+def _documento_para_dict(doc: Document) -> Dict[str, Any]:
+    return {"page_content": doc.page_content, "metadata": doc.metadata}
+
+
+# --- FILTROS `where` (mesma sintaxe do Chroma, avaliados em Python) ---
+
+def _comparar(valor, operador: str, alvo) -> bool:
+    if operador == "$eq":
+        return valor == alvo
+    if operador == "$ne":
+        return valor != alvo
+    if operador == "$in":
+        return valor in alvo
+    if operador == "$nin":
+        return valor not in alvo
+    try:
+        if operador == "$gt":
+            return valor > alvo
+        if operador == "$gte":
+            return valor >= alvo
+        if operador == "$lt":
+            return valor < alvo
+        if operador == "$lte":
+            return valor <= alvo
+    except TypeError:
+        return False
+    raise ValueError(f"Operador de filtro não suportado: {operador}")
+
+
+def avaliar_filtro(metadados: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Avalia uma cláusula `where` (ver rag_engine.construir_filtro) sobre um metadado."""
+    if not where:
+        return True
+    for chave, condicao in where.items():
+        if chave == "$and":
+            if not all(avaliar_filtro(metadados, c) for c in condicao):
+                return False
+        elif chave == "$or":
+            if not any(avaliar_filtro(metadados, c) for c in condicao):
+                return False
+        else:
+            if chave not in metadados:
+                return False
+            if not isinstance(condicao, dict):
+                condicao = {"$eq": condicao}
+            if not all(_comparar(metadados[chave], op, alvo) for op, alvo in condicao.items()):
+                return False
+    return True
+
+
+# --- EXPORTAÇÃO ---
+
+def exportar_snapshot(motor, destino: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Empacota todos os shards do `motor` (RAGEngine com Chroma) em `destino`.
+    Retorna o manifesto gravado.
+    """
+    destino = Path(destino)
+    garantir_diretorios(destino.parent)
+
+    blocos_vetores, ids, documentos, metadados = [], [], [], []
+    shards: Dict[str, Dict[str, Any]] = {}
+    dimensao = 0
+
+    for edicao, info in motor.listar_shards().items():
+        colecao = motor.client.get_collection(info["colecao"])
+        dados = colecao.get(include=["embeddings", "documents", "metadatas"])
+        vetores = np.asarray(dados["embeddings"] if dados["embeddings"] is not None else [], dtype=np.float32)
+        if len(vetores) == 0:
+            continue
+        if dimensao and vetores.shape[1] != dimensao:
+            raise ValueError(f"Shard '{edicao}' com dimensão {vetores.shape[1]} (esperado {dimensao}).")
+        dimensao = vetores.shape[1]
+
+        inicio = len(ids)
+        blocos_vetores.append(vetores)
+        ids.extend(dados["ids"])
+        documentos.extend(dados["documents"])
+        metadados.extend(m or {} for m in dados["metadatas"])
+        shards[edicao] = {**info, "inicio": inicio, "fim": len(ids), "n_vetores": len(ids) - inicio}
+
+    # Documentos pais referenciados pelos vetores
+    ids_pais = list(dict.fromkeys(m[motor.id_key] for m in metadados if motor.id_key in m))
+    blocos_pais, indice_pais, posicao_pai = [], {}, 0
+    for doc_id, doc in zip(ids_pais, motor.store.mget(ids_pais)):
+        if doc is not None:
+            bloco = json.dumps(_documento_para_dict(doc), ensure_ascii=False).encode("utf-8")
+            indice_pais[doc_id] = [posicao_pai, len(bloco)]
+            blocos_pais.append(bloco)
+            posicao_pai += len(bloco)
+    faltantes = len(ids_pais) - len(indice_pais)
+    if faltantes:
+        print(f"⚠️ {faltantes} documentos pais não encontrados (re-indexe para incluí-los no snapshot).")
+
+    matriz = np.concatenate(blocos_vetores) if blocos_vetores else np.zeros((0, 0), dtype=np.float32)
+    secoes_bytes = {
+        "vetores": np.ascontiguousarray(matriz, dtype="<f4").tobytes(),
+        "registros": json.dumps({"ids": ids, "documentos": documentos, "metadados": metadados},
+                                ensure_ascii=False).encode("utf-8"),
+        "indice_pais": json.dumps(indice_pais, ensure_ascii=False).encode("utf-8"),
+        "pais": b"".join(blocos_pais),
+    }
+
+    secoes, posicao = {}, 0
+    for nome, dados in secoes_bytes.items():
+        secoes[nome] = {"offset": posicao, "tamanho": len(dados), "sha256": _sha256(dados)}
+        posicao = _alinhar(posicao + len(dados))
+
+    manifesto = {
+        "formato": VERSAO_FORMATO,
+        "criado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "embedding": {"provedor": EMBEDDING_PROVIDER, "modelo": EMBEDDING_MODEL_NAME, "dimensao": dimensao},
+        "n_vetores": len(ids),
+        "n_pais": len(indice_pais),
+        "shards": shards,
+        "secoes": secoes,
+    }
+    manifesto_bytes = json.dumps(manifesto, ensure_ascii=False).encode("utf-8")
+    inicio_secoes = _alinhar(_CABECALHO.size + len(manifesto_bytes))
+
+    # Grava num temporário e renomeia: um snapshot pela metade nunca fica visível
+    temporario = destino.with_suffix(destino.suffix + ".tmp")
+    with open(temporario, "wb") as f:
+        f.write(_CABECALHO.pack(MAGICO, len(manifesto_bytes)))
+        f.write(manifesto_bytes)
+        for nome, dados in secoes_bytes.items():
+            f.seek(inicio_secoes + secoes[nome]["offset"])
+            f.write(dados)
+    temporario.replace(destino)
+
+    print(f"   [OK] Snapshot exportado: {destino} ({len(shards)} shards, {len(ids)} vetores, {len(indice_pais)} pais).")
+    return manifesto
+
+
+# --- IMPORTAÇÃO (somente leitura) ---
+
+class Snapshot:
+    """Snapshot aberto via mmap. A matriz de vetores aponta direto para o arquivo."""
+
+    def __init__(self, caminho: Union[str, Path], verificar: bool = True):
+        self.caminho = Path(caminho)
+        with open(self.caminho, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < _CABECALHO.size:
+            raise ValueError(f"Snapshot inválido (arquivo truncado): {self.caminho}")
+        magico, tamanho_manifesto = _CABECALHO.unpack_from(self._mmap, 0)
+        if magico != MAGICO:
+            raise ValueError(f"Arquivo não é um snapshot do ECLADATTA: {self.caminho}")
+
+        fim_manifesto = _CABECALHO.size + tamanho_manifesto
+        self.manifesto = json.loads(self._mmap[_CABECALHO.size:fim_manifesto].decode("utf-8"))
+        if self.manifesto.get("formato") != VERSAO_FORMATO:
+            raise ValueError(f"Versão de snapshot não suportada: {self.manifesto.get('formato')}")
+        self._inicio_secoes = _alinhar(fim_manifesto)
+
+        if verificar:
+            self.verificar()
+
+        n = self.manifesto["n_vetores"]
+        dimensao = self.manifesto["embedding"]["dimensao"]
+        secao = self.manifesto["secoes"]["vetores"]
+        if secao["tamanho"] != n * dimensao * 4:
+            raise ValueError(f"Snapshot inconsistente: seção 'vetores' não tem {n} x {dimensao} float32.")
+        self.dimensao = dimensao
+        self.vetores = np.frombuffer(
+            self._mmap, dtype="<f4", count=n * dimensao, offset=self._inicio_secoes + secao["offset"]
+        ).reshape(n, dimensao)
+
+        registros = json.loads(bytes(self._secao("registros")).decode("utf-8"))
+        self.ids: List[str] = registros["ids"]
+        self.documentos: List[str] = registros["documentos"]
+        self.metadados: List[Dict[str, Any]] = registros["metadados"]
+        self._indice_pais: Dict[str, List[int]] = json.loads(bytes(self._secao("indice_pais")).decode("utf-8"))
+
+    def _secao(self, nome: str) -> memoryview:
+        secao = self.manifesto["secoes"][nome]
+        inicio = self._inicio_secoes + secao["offset"]
+        return memoryview(self._mmap)[inicio:inicio + secao["tamanho"]]
+
+    def verificar(self):
+        """Confere o sha256 de cada seção; levanta ValueError se o arquivo estiver corrompido."""
+        for nome, secao in self.manifesto["secoes"].items():
+            if _sha256(self._secao(nome)) != secao["sha256"]:
+                raise ValueError(f"Snapshot corrompido: checksum da seção '{nome}' não confere.")
+
+    @property
+    def shards(self) -> Dict[str, Dict[str, Any]]:
+        return self.manifesto["shards"]
+
+    def documento_pai(self, doc_id: str) -> Optional[Document]:
+        """Decodifica um documento pai direto do mmap (None se não existir)."""
+        posicao = self._indice_pais.get(doc_id)
+        if posicao is None:
+            return None
+        offset, tamanho = posicao
+        doc = json.loads(bytes(self._secao("pais")[offset:offset + tamanho]).decode("utf-8"))
+        return Document(page_content=doc["page_content"], metadata=doc["metadata"])
+
+    def loja_pais(self) -> "SnapshotDocStore":
+        return SnapshotDocStore(self)
+
+    def vectorstore(self, edicao: str, embedding: Embeddings) -> "SnapshotVectorStore":
+        info = self.shards[edicao]
+        return SnapshotVectorStore(self, info["inicio"], info["fim"], embedding)
+
+
+class SnapshotDocStore(BaseStore[str, Document]):
+    """ByteStore somente leitura dos documentos pais: cada `mget` lê só os ids pedidos."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[Document]]:
+        return [self.snapshot.documento_pai(k) for k in keys]
+
+    def mset(self, key_value_pairs: Sequence[Tuple[str, Document]]) -> None:
+        raise NotImplementedError("Snapshot é somente leitura.")
+
+    def mdelete(self, keys: Sequence[str]) -> None:
+        raise NotImplementedError("Snapshot é somente leitura.")
+
+    def yield_keys(self, *, prefix: Optional[str] = None) -> Iterator[str]:
+        for k in self.snapshot._indice_pais:
+            if prefix is None or k.startswith(prefix):
+                yield k
+
+
+class SnapshotVectorStore(VectorStore):
+    """
+    Vector store somente leitura sobre as linhas [inicio, fim) de um Snapshot.
+    Distância L2 ao quadrado (a mesma métrica padrão das coleções do Chroma),
+    para que resultados de shards diferentes continuem comparáveis.
+    """
+
+    def __init__(self, snapshot: Snapshot, inicio: int, fim: int, embedding: Embeddings):
+        self.snapshot = snapshot
+        self.inicio = inicio
+        self.fim = fim
+        self._embedding = embedding
+        self._normas: Optional[np.ndarray] = None
+        self._mascaras: Dict[str, np.ndarray] = {}
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    def _mascara(self, where: Dict[str, Any]) -> np.ndarray:
+        chave = json.dumps(where, sort_keys=True)
+        if chave not in self._mascaras:
+            if len(self._mascaras) >= 256:
+                self._mascaras.clear()
+            self._mascaras[chave] = np.fromiter(
+                (avaliar_filtro(m, where) for m in self.snapshot.metadados[self.inicio:self.fim]),
+                dtype=bool, count=self.fim - self.inicio,
+            )
+        return self._mascaras[chave]
+
+    def similarity_search_by_vector_with_relevance_scores(
+            self, embedding: List[float], k: int = 4, filter: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        vetores = self.snapshot.vetores[self.inicio:self.fim]
+        if len(vetores) == 0:
+            return []
+        if self._normas is None:
+            self._normas = np.einsum("ij,ij->i", vetores, vetores)
+
+        consulta = np.asarray(embedding, dtype=np.float32)
+        if consulta.shape != (self.snapshot.dimensao,):
+            raise ValueError(f"Vetor da pergunta com dimensão {consulta.shape[-1]}, "
+                             f"snapshot com {self.snapshot.dimensao}.")
+        distancias = np.maximum(self._normas - 2 * (vetores @ consulta) + float(consulta @ consulta), 0)
+        if filter:
+            distancias = np.where(self._mascara(filter), distancias, np.inf)
+
+        k = min(k, len(distancias))
+        melhores = np.argpartition(distancias, k - 1)[:k]
+        melhores = melhores[np.argsort(distancias[melhores])]
+
+        resultados = []
+        for i in melhores:
+            if not np.isfinite(distancias[i]):
+                break
+            linha = self.inicio + int(i)
+            doc = Document(page_content=self.snapshot.documentos[linha] or "",
+                           metadata=dict(self.snapshot.metadados[linha]), id=self.snapshot.ids[linha])
+            resultados.append((doc, float(distancias[i])))
+        return resultados
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        vetor = self._embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_relevance_scores(vetor, k=k, filter=filter)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [d for d, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None, **kwargs: Any) -> List[str]:
+        raise NotImplementedError("Snapshot é somente leitura; re-indexe com o Chroma e exporte de novo.")
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   **kwargs: Any) -> "SnapshotVectorStore":
+        raise NotImplementedError("Use Snapshot(caminho).vectorstore(edicao, embedding).")
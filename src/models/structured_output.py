@@ -0,0 +1,234 @@
+# Arquivo: src/models/structured_output.py
+"""
+Saída JSON estruturada para as chamadas de extração e do juiz de alucinação.
+
+- Os schemas ficam definidos uma única vez aqui e são enviados ao Ollama no parâmetro
+  `format` (decodificação restrita ao JSON schema), via ModeloGovernado.com_formato.
+- A resposta é consumida em streaming por um parser incremental: assim que o objeto
+  JSON de nível superior fecha, a geração é interrompida (não há tokens desperdiçados
+  com texto depois do JSON).
+- Se a saída vier truncada (limite de tokens, conexão caída), o JSON é reparado
+  (strings e colchetes fechados, último item incompleto descartado) em vez de a
+  chamada inteira ser refeita.
+"""
+import json
+from contextlib import aclosing, closing
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import Runnable
+
+# --- SCHEMAS ---
+
+SCHEMA_RELACOES: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "relacoes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "entidade_origem": {"type": "string"},
+                    "relacao": {"type": "string"},
+                    "entidade_destino": {"type": "string"},
+                    "valor": {"type": "string"},
+                    "fonte": {"type": "string"},
+                },
+                "required": ["entidade_origem", "relacao", "entidade_destino", "valor", "fonte"],
+            },
+        },
+    },
+    "required": ["relacoes"],
+}
+
+SCHEMA_JUIZ: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "tem_alucinacao": {"type": "boolean"},
+        "numeros_incorretos": {"type": "array", "items": {"type": "string"}},
+        "justificativa": {"type": "string"},
+    },
+    "required": ["tem_alucinacao", "numeros_incorretos", "justificativa"],
+}
+
+_FECHAMENTO = {"{": "}", "[": "]"}
+
+
+# --- PARSER INCREMENTAL ---
+
+class ParserJsonIncremental:
+    """
+    Recebe o texto do modelo aos pedaços e detecta quando o primeiro valor JSON
+    (objeto ou lista) está completo. Texto antes dele (ex: ```json) é ignorado.
+
+    Guarda também os pontos de corte seguros (após cada valor completo dentro de um
+    contêiner), usados por `reparar` quando a saída termina no meio do JSON.
+    """
+
+    def __init__(self):
+        self.texto = []
+        self.tamanho = 0
+        self.iniciado = False
+        self.completo = False
+        self._pilha: List[str] = []
+        self._em_string = False
+        self._escape = False
+        self._cortes: List[Tuple[int, str]] = []  # (posição, fechamentos pendentes)
+
+    def alimentar(self, pedaco: str) -> bool:
+        """Consome mais texto. Retorna True quando o valor JSON fechou."""
+        for c in pedaco:
+            if self.completo:
+                break
+            if not self.iniciado:
+                if c not in _FECHAMENTO:
+                    continue
+                self.iniciado = True
+            self.texto.append(c)
+            self.tamanho += 1
+            self._avancar(c)
+        return self.completo
+
+    def _avancar(self, c: str):
+        if self._em_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._em_string = False
+            return
+
+        if c == '"':
+            self._em_string = True
+        elif c in _FECHAMENTO:
+            self._pilha.append(_FECHAMENTO[c])
+        elif c in "}]":
+            if self._pilha:
+                self._pilha.pop()
+            if not self._pilha:
+                self.completo = True
+            else:
+                self._cortes.append((self.tamanho, "".join(reversed(self._pilha))))
+        elif c == ",":
+            # Tudo antes da vírgula é uma sequência de itens completos
+            self._cortes.append((self.tamanho - 1, "".join(reversed(self._pilha))))
+
+    def valor(self) -> Any:
+        """JSON completo já decodificado (OutputParserException se inválido)."""
+        texto = "".join(self.texto)
+        try:
+            return json.loads(texto)
+        except json.JSONDecodeError as e:
+            raise OutputParserException(f"JSON inválido na saída do modelo: {e}", llm_output=texto) from e
+
+    def reparar(self) -> Any:
+        """
+        Fecha um JSON truncado. Tenta, em ordem: fechar a string e os contêineres abertos;
+        depois cortar no último item completo e fechar a partir dali.
+        """
+        texto = "".join(self.texto)
+        if not self.iniciado:
+            raise OutputParserException("Nenhum JSON na saída do modelo.", llm_output=texto)
+
+        fechamento = "".join(reversed(self._pilha))
+        tentativas = [texto + ('"' if self._em_string else "") + fechamento]
+        tentativas += [texto[:posicao] + pendentes for posicao, pendentes in reversed(self._cortes)]
+        for candidato in tentativas:
+            try:
+                return json.loads(candidato)
+            except json.JSONDecodeError:
+                continue
+        # Último recurso: contêiner de nível superior vazio
+        return json.loads(texto[0] + _FECHAMENTO[texto[0]])
+
+    def resultado(self) -> Tuple[Any, bool]:
+        """(valor, reparado). Usa o JSON completo quando possível; senão, repara."""
+        if self.completo:
+            try:
+                return self.valor(), False
+            except OutputParserException:
+                pass
+        return self.reparar(), True
+
+
+def podar_incompletos(valor: Any, schema: Optional[Dict[str, Any]]) -> Any:
+    """
+    Remove de listas os objetos que não têm todos os campos obrigatórios do schema
+    (o último item de uma saída reparada costuma estar pela metade).
+    """
+    if not schema:
+        return valor
+    if isinstance(valor, dict):
+        propriedades = schema.get("properties", {})
+        return {k: podar_incompletos(v, propriedades.get(k)) for k, v in valor.items()}
+    if isinstance(valor, list):
+        itens = schema.get("items") or {}
+        obrigatorios = itens.get("required", [])
+        return [podar_incompletos(v, itens) for v in valor
+                if not (isinstance(v, dict) and any(campo not in v for campo in obrigatorios))]
+    return valor
+
+
+def reparar_json(texto: str, schema: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Decodifica uma saída de modelo já recebida (com cercas Markdown, texto extra ou truncada).
+    Se foi preciso reparar e houver `schema`, itens incompletos são descartados.
+    """
+    parser = ParserJsonIncremental()
+    parser.alimentar(texto or "")
+    valor, reparado = parser.resultado()
+    return podar_incompletos(valor, schema) if reparado else valor
+
+
+# --- RUNNABLE ---
+
+def _texto_pedaco(pedaco) -> str:
+    conteudo = getattr(pedaco, "content", pedaco)
+    return conteudo if isinstance(conteudo, str) else ""
+
+
+class GeradorJson(Runnable):
+    """
+    Passo final de cadeia (prompt | GeradorJson(llm, schema)) que devolve o JSON já
+    decodificado. Com `schema`, o modelo é restrito a ele (format do Ollama); a geração
+    é cortada quando o objeto fecha e saídas truncadas são reparadas.
+    """
+
+    def __init__(self, llm, schema: Optional[Dict[str, Any]] = None):
+        if schema is not None and hasattr(llm, "com_formato"):
+            llm = llm.com_formato(schema)
+        self.llm = llm
+        self.schema = schema
+        # Estatísticas: chamadas, saídas reparadas e cortadas assim que o JSON fechou
+        self.chamadas = 0
+        self.reparadas = 0
+        self.interrompidas = 0
+
+    def _concluir(self, parser: ParserJsonIncremental) -> Any:
+        valor, reparado = parser.resultado()
+        if reparado:
+            self.reparadas += 1
+            valor = podar_incompletos(valor, self.schema)
+        return valor
+
+    def invoke(self, input, config=None, **kwargs):
+        self.chamadas += 1
+        parser = ParserJsonIncremental()
+        with closing(self.llm.stream(input, config, **kwargs)) as pedacos:
+            for pedaco in pedacos:
+                if parser.alimentar(_texto_pedaco(pedaco)):
+                    # Fechar o stream encerra a requisição ao servidor e interrompe a geração
+                    self.interrompidas += 1
+                    break
+        return self._concluir(parser)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.chamadas += 1
+        parser = ParserJsonIncremental()
+        async with aclosing(self.llm.astream(input, config, **kwargs)) as pedacos:
+            async for pedaco in pedacos:
+                if parser.alimentar(_texto_pedaco(pedaco)):
+                    self.interrompidas += 1
+                    break
+        return self._concluir(parser)
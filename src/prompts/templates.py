@@ -1,18 +1,22 @@
 # Arquivo: src/prompts/templates.py
-import yaml
+import hashlib
+from functools import lru_cache
 from pathlib import Path
-from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
 # Caminho para o arquivo YAML
 CURRENT_DIR = Path(__file__).parent
 YAML_PATH = CURRENT_DIR / "system_prompts.yaml"
 
 
+@lru_cache(maxsize=1)
 def load_prompts_from_yaml():
     """
     Carrega os prompts brutos do arquivo YAML.
     Isso facilita a edição dos prompts sem tocar no código Python.
+    O arquivo só é lido no primeiro uso (e não na importação do módulo).
     """
+    import yaml
+
     if not YAML_PATH.exists():
         raise FileNotFoundError(f"Arquivo de prompts não encontrado em: {YAML_PATH}")
 
@@ -20,40 +24,54 @@ def load_prompts_from_yaml():
         return yaml.safe_load(f)
 
 
-# Carrega os dicionários uma única vez ao importar o módulo
-_prompts_data = load_prompts_from_yaml()
-
-
-# --- FÁBRICA DE TEMPLATES ---
+def _criar_template(chave: str):
+    from langchain_core.prompts import ChatPromptTemplate
 
-def get_resumo_tabela_prompt() -> ChatPromptTemplate:
-    """Retorna o template para resumir tabelas (Ingestão)."""
-    p_data = _prompts_data['resumo_tabela']
+    p_data = load_prompts_from_yaml()[chave]
     return ChatPromptTemplate.from_messages([
         ("system", p_data['system']),
         ("human", p_data['user'])
     ])
 
 
-def get_rag_qa_prompt() -> ChatPromptTemplate:
+def versao_prompt(chave: str) -> str:
+    """
+    Versão de um prompt = hash curto do seu texto (system + user) no YAML.
+    Qualquer edição no prompt muda a versão e invalida caches derivados dele.
+    """
+    p_data = load_prompts_from_yaml()[chave]
+    texto = f"{p_data['system']}\x00{p_data['user']}"
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:12]
+
+
+# --- FÁBRICA DE TEMPLATES ---
+
+def get_resumo_tabela_prompt():
+    """Retorna o template para resumir tabelas (Ingestão)."""
+    return _criar_template('resumo_tabela')
+
+
+def get_rag_qa_prompt():
     """Retorna o template para a resposta final ao usuário (RAG)."""
-    p_data = _prompts_data['rag_qa_final']
-    return ChatPromptTemplate.from_messages([
-        ("system", p_data['system']),
-        ("human", p_data['user'])
-    ])
+    return _criar_template('rag_qa_final')
 
 
-def get_extracao_relacoes_prompt() -> ChatPromptTemplate:
+def get_extracao_relacoes_prompt():
     """Retorna o template para extração estruturada (JSON)."""
-    p_data = _prompts_data['extracao_relacoes']
-    return ChatPromptTemplate.from_messages([
-        ("system", p_data['system']),
-        ("human", p_data['user'])
-    ])
+    return _criar_template('extracao_relacoes')
+
+
+# Instâncias prontas para importação direta (criadas sob demanda via PEP 562)
+_FABRICAS = {
+    "PROMPT_RESUMO": get_resumo_tabela_prompt,
+    "PROMPT_RAG_FINAL": get_rag_qa_prompt,
+    "PROMPT_EXTRACAO": get_extracao_relacoes_prompt,
+}
 
 
-# Instâncias prontas para importação direta
-PROMPT_RESUMO = get_resumo_tabela_prompt()
-PROMPT_RAG_FINAL = get_rag_qa_prompt()
-PROMPT_EXTRACAO = get_extracao_relacoes_prompt()
\ No newline at end of file
+def __getattr__(nome: str):
+    if nome in _FABRICAS:
+        valor = _FABRICAS[nome]()
+        globals()[nome] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")